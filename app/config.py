@@ -15,6 +15,9 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'sqlite:///portfolio.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Rendered share images (defaults to <instance_path>/share_images)
+    SHARE_IMAGE_CACHE_DIR = os.environ.get('SHARE_IMAGE_CACHE_DIR')
+
     # Google OAuth
     GOOGLE_CLIENT_ID = os.environ.get('GOOGLE_CLIENT_ID')
     GOOGLE_CLIENT_SECRET = os.environ.get('GOOGLE_CLIENT_SECRET')
@@ -38,6 +41,17 @@ class Config:
     # Mistral API
     MISTRAL_API_KEY = os.environ.get('MISTRAL_API_KEY')
 
+    # Per-process limits on OCR / LLM calls (RPS of 0 means no spacing)
+    MISTRAL_MAX_CONCURRENCY = int(os.environ.get('MISTRAL_MAX_CONCURRENCY', '4'))
+    MISTRAL_RPS = float(os.environ.get('MISTRAL_RPS', '5'))
+    OPENAI_MAX_CONCURRENCY = int(os.environ.get('OPENAI_MAX_CONCURRENCY', '8'))
+    OPENAI_RPS = float(os.environ.get('OPENAI_RPS', '0'))
+
+    # Share image renderer: 'pil' (in-process, default) or 'playwright' (HTML template)
+    SHARE_IMAGE_RENDERER = os.environ.get('SHARE_IMAGE_RENDERER', 'pil')
+    # Exhaustive PNG optimisation for the Pillow renderer (smaller files, much slower encode)
+    SHARE_IMAGE_PNG_OPTIMIZE = os.environ.get('SHARE_IMAGE_PNG_OPTIMIZE', 'False').lower() == 'true'
+
     # PDF upload limits
     PDF_DAILY_UPLOAD_LIMIT = int(os.environ.get('PDF_DAILY_UPLOAD_LIMIT', '3'))
 
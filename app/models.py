@@ -78,9 +78,15 @@ class Purchase(db.Model):
     original_currency = db.Column(db.String(3), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
-    # Relationships
+    # Relationships (selectin: loading a list of purchases fetches all their
+    # assignments in one extra query, so shares_remaining isn't N+1)
     sale_assignments = db.relationship('PurchaseSaleAssignment', backref='purchase',
-                                      lazy=True, cascade='all, delete-orphan')
+                                      lazy='selectin', cascade='all, delete-orphan')
+
+    # FIFO sale lookups filter by user and ticker in purchase_date order
+    __table_args__ = (
+        Index('ix_purchases_user_ticker_date', 'user_id', 'ticker', 'purchase_date'),
+    )
 
     @property
     def shares_sold(self):
@@ -125,9 +131,9 @@ class Sale(db.Model):
 
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
-    # Relationships
+    # Relationships (selectin: assignments for a list of sales load in one query)
     purchase_assignments = db.relationship('PurchaseSaleAssignment', backref='sale',
-                                          lazy=True, cascade='all, delete-orphan')
+                                          lazy='selectin', cascade='all, delete-orphan')
     reinvestment_purchase = db.relationship('Purchase', foreign_keys=[reinvestment_purchase_id],
                                            backref='reinvested_from_sale')
 
@@ -157,6 +163,14 @@ class PurchaseSaleAssignment(db.Model):
     proceeds = db.Column(db.Float, nullable=False)
     realized_gain_loss = db.Column(db.Float, nullable=False)
 
+    # Assignments are loaded per sale (and walked by purchase); on Postgres
+    # the composite also carries the amounts so those loads are index-only
+    __table_args__ = (
+        Index('ix_psa_purchase_id', 'purchase_id'),
+        Index('ix_psa_sale_purchase', 'sale_id', 'purchase_id',
+              postgresql_include=['shares_assigned', 'cost_basis', 'proceeds', 'realized_gain_loss']),
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
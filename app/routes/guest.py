@@ -4,7 +4,7 @@ from app import db, csrf
 from app.models import Purchase, ComparisonStock
 from app.services.stock_data import (
     validate_ticker, is_trading_day, get_price_on_date,
-    get_current_prices, get_price_history
+    get_current_prices, get_price_histories
 )
 from datetime import datetime
 from collections import namedtuple
@@ -288,9 +288,7 @@ def get_guest_portfolio_history():
     start_date = min(p.purchase_date for p in purchases)
 
     # Get price history for all tickers
-    price_histories = {}
-    for ticker in all_tickers:
-        price_histories[ticker] = get_price_history(ticker, start_date)
+    price_histories = get_price_histories(all_tickers, start_date)
 
     # Build date series (use dates from any ticker's history)
     if price_histories.get(actual_tickers[0]):
@@ -330,12 +328,15 @@ def get_guest_portfolio_history():
     actual_values = []
     alt_values = {cs.ticker: [] for cs in comparison_stocks}
 
+    # Hoist per-ticker price lookups out of the per-date loop
+    comp_prices_by_ticker = {cs.ticker: price_histories.get(cs.ticker, {}) for cs in comparison_stocks}
+    purchase_prices = [price_histories.get(purchase.ticker, {}) for purchase in purchases]
+
     for date in dates:
         # Actual portfolio value on this date
         actual_value = 0
-        for purchase in purchases:
+        for purchase, ticker_prices in zip(purchases, purchase_prices):
             if purchase.purchase_date <= date:
-                ticker_prices = price_histories.get(purchase.ticker, {})
                 price = ticker_prices.get(date)
                 if price:
                     actual_value += purchase.shares_bought * price
@@ -344,13 +345,13 @@ def get_guest_portfolio_history():
         # Alternative portfolio values using pre-computed shares
         for comp_stock in comparison_stocks:
             alt_value = 0
+            comp_prices = comp_prices_by_ticker[comp_stock.ticker]
             for purchase in purchases:
                 if purchase.purchase_date <= date:
                     # Use pre-computed shares
                     comp_shares = comp_shares_per_purchase.get((comp_stock.ticker, purchase.id))
                     if comp_shares:
                         # Value on this date using price history
-                        comp_prices = price_histories.get(comp_stock.ticker, {})
                         comp_price = comp_prices.get(date)
                         if comp_price:
                             alt_value += comp_shares * comp_price
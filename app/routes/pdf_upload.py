@@ -8,7 +8,7 @@ from datetime import datetime, date, timedelta
 from app import db
 from app.models import Purchase, PdfUploadLog
 from app.services.pdf_extractor import extract_trades_from_pdf
-from app.services.stock_data import validate_ticker, is_trading_day, invalidate_price_cache
+from app.services.stock_data import validate_ticker, is_trading_day, schedule_price_cache_invalidation
 
 pdf_upload_bp = Blueprint('pdf_upload', __name__)
 
@@ -355,8 +355,8 @@ def confirm_trades():
     try:
         if saved_count > 0:
             db.session.commit()
-            # Invalidate price cache to ensure fresh prices on next fetch
-            invalidate_price_cache()
+            # Invalidate price cache once the response is sent to ensure fresh prices on next fetch
+            schedule_price_cache_invalidation()
     except Exception as e:
         db.session.rollback()
         current_app.logger.error(f"Error committing trades to database: {e}")
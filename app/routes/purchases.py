@@ -2,17 +2,35 @@ from flask import Blueprint, request, jsonify
 from flask_login import login_required, current_user
 from app import db
 from app.models import Purchase, ComparisonStock
-from app.services.stock_data import validate_ticker, is_trading_day, get_price_on_date, get_current_price, get_price_history, invalidate_price_cache
+from app.services.stock_data import validate_ticker, is_trading_day, get_price_on_date, get_prices_on_date, get_current_price, get_price_histories, schedule_price_cache_invalidation
 from datetime import datetime
+from sqlalchemy import select, bindparam
+import numpy as np
 
 purchases_bp = Blueprint('purchases', __name__)
 
+# Built once so SQLAlchemy's compiled statement cache is reused across requests
+_purchases_for_user = (
+    select(Purchase)
+    .where(Purchase.user_id == bindparam('uid'))
+    .order_by(Purchase.purchase_date.desc())
+)
+
+
+def round_series(values):
+    """Round a value series to cents in one pass. Missing values (None) stay None."""
+    series = np.array(values, dtype=float)  # None -> NaN
+    np.round(series, 2, out=series)
+    rounded = series.astype(object)
+    rounded[np.isnan(series)] = None
+    return rounded.tolist()
+
 
 @purchases_bp.route('/purchases', methods=['GET'])
 @login_required
 def get_purchases():
     """Get all purchases for the current user."""
-    purchases = Purchase.query.filter_by(user_id=current_user.id).order_by(Purchase.purchase_date.desc()).all()
+    purchases = db.session.scalars(_purchases_for_user, {'uid': current_user.id}).all()
     return jsonify([p.to_dict() for p in purchases])
 
 
@@ -103,8 +121,8 @@ def create_purchase():
     db.session.add(purchase)
     db.session.commit()
 
-    # Invalidate price cache to ensure fresh prices on next fetch
-    invalidate_price_cache()
+    # Invalidate price cache once the response is sent to ensure fresh prices on next fetch
+    schedule_price_cache_invalidation()
 
     return jsonify(purchase.to_dict()), 201
 
@@ -120,8 +138,8 @@ def delete_purchase(id):
     db.session.delete(purchase)
     db.session.commit()
 
-    # Invalidate price cache to ensure fresh prices on next fetch
-    invalidate_price_cache()
+    # Invalidate price cache once the response is sent to ensure fresh prices on next fetch
+    schedule_price_cache_invalidation()
 
     return jsonify({'message': 'Purchase deleted'}), 200
 
@@ -129,7 +147,14 @@ def delete_purchase(id):
 @purchases_bp.route('/purchases/<int:id>/comparison', methods=['GET'])
 @login_required
 def get_purchase_comparison(id):
-    """Get comparison data for a single purchase against benchmark stocks."""
+    """
+    Get comparison data for a single purchase against benchmark stocks.
+
+    Pass ?include_history=false to skip the price-history series (the most
+    expensive part) when only the summary numbers are needed.
+    """
+    include_history = request.args.get('include_history', 'true').lower() != 'false'
+
     # Get the purchase (must belong to current user)
     purchase = Purchase.query.filter_by(id=id, user_id=current_user.id).first()
     if not purchase:
@@ -149,12 +174,19 @@ def get_purchase_comparison(id):
 
     # Calculate alternatives
     alternatives = []
+    comp_prices_at_purchase = {}  # {comp_ticker: price on purchase date}, reused by history
+    # Prices of the other comparison stocks on the purchase date, in one query
+    other_prices = get_prices_on_date(
+        [comp_stock.ticker for comp_stock in comparison_stocks if comp_stock.ticker != purchase.ticker],
+        purchase.purchase_date
+    )
     for comp_stock in comparison_stocks:
         # Get price of comparison stock on purchase date
         if comp_stock.ticker == purchase.ticker:
             comp_price_at_purchase = purchase.price_at_purchase
         else:
-            comp_price_at_purchase = get_price_on_date(comp_stock.ticker, purchase.purchase_date)
+            comp_price_at_purchase = other_prices.get(comp_stock.ticker)
+        comp_prices_at_purchase[comp_stock.ticker] = comp_price_at_purchase
         if comp_price_at_purchase is None:
             continue
 
@@ -184,12 +216,30 @@ def get_purchase_comparison(id):
             'difference_vs_actual': round(difference_vs_actual, 2)
         })
 
+    summary = {
+        'purchase': {
+            'id': purchase.id,
+            'ticker': purchase.ticker,
+            'purchase_date': purchase.purchase_date.isoformat(),
+            'amount': round(purchase.amount, 2),
+            'shares_bought': round(purchase.shares_bought, 4),
+            'price_at_purchase': round(purchase.price_at_purchase, 2)
+        },
+        'actual': {
+            'current_price': round(current_price, 2),
+            'current_value': round(actual_current_value, 2),
+            'gain_loss': round(actual_gain_loss, 2),
+            'return_pct': round(actual_return_pct, 2)
+        },
+        'alternatives': alternatives
+    }
+
+    if not include_history:
+        return jsonify(summary)
+
     # Get historical data for charting
-    price_histories = {}
     all_tickers = [purchase.ticker] + [cs.ticker for cs in comparison_stocks]
-
-    for ticker in all_tickers:
-        price_histories[ticker] = get_price_history(ticker, purchase.purchase_date)
+    price_histories = get_price_histories(all_tickers, purchase.purchase_date)
 
     # Build date series from actual ticker's history
     if price_histories.get(purchase.ticker):
@@ -201,50 +251,37 @@ def get_purchase_comparison(id):
     actual_history = []
     alt_histories = {cs.ticker: [] for cs in comparison_stocks}
 
+    # Hoist loop-invariant lookups out of the per-date loop
+    ticker_prices = price_histories.get(purchase.ticker, {})
+    comp_prices_by_ticker = {cs.ticker: price_histories.get(cs.ticker, {}) for cs in comparison_stocks}
+    comp_shares_by_ticker = {}
+    for ticker, comp_price_at_purchase in comp_prices_at_purchase.items():
+        if comp_price_at_purchase:
+            comp_shares_by_ticker[ticker] = purchase.amount / comp_price_at_purchase
+
     for date in dates:
         # Actual value on this date
-        ticker_prices = price_histories.get(purchase.ticker, {})
         price = ticker_prices.get(date)
         if price:
-            actual_value = purchase.shares_bought * price
-            actual_history.append(round(actual_value, 2))
+            actual_history.append(purchase.shares_bought * price)
         else:
             actual_history.append(None)
 
         # Alternative values on this date
         for comp_stock in comparison_stocks:
-            if comp_stock.ticker == purchase.ticker:
-                comp_price_at_purchase = purchase.price_at_purchase
-            else:
-                comp_price_at_purchase = get_price_on_date(comp_stock.ticker, purchase.purchase_date)
-            if comp_price_at_purchase:
-                comp_shares = purchase.amount / comp_price_at_purchase
-                comp_prices = price_histories.get(comp_stock.ticker, {})
-                comp_price = comp_prices.get(date)
-                if comp_price:
-                    alt_value = comp_shares * comp_price
-                    alt_histories[comp_stock.ticker].append(round(alt_value, 2))
-                else:
-                    alt_histories[comp_stock.ticker].append(None)
+            comp_shares = comp_shares_by_ticker.get(comp_stock.ticker)
+            comp_price = comp_prices_by_ticker[comp_stock.ticker].get(date)
+            if comp_shares is not None and comp_price:
+                alt_histories[comp_stock.ticker].append(comp_shares * comp_price)
             else:
                 alt_histories[comp_stock.ticker].append(None)
 
+    # Round every series once rather than per data point
+    actual_history = round_series(actual_history)
+    alt_histories = {ticker: round_series(values) for ticker, values in alt_histories.items()}
+
     return jsonify({
-        'purchase': {
-            'id': purchase.id,
-            'ticker': purchase.ticker,
-            'purchase_date': purchase.purchase_date.isoformat(),
-            'amount': round(purchase.amount, 2),
-            'shares_bought': round(purchase.shares_bought, 4),
-            'price_at_purchase': round(purchase.price_at_purchase, 2)
-        },
-        'actual': {
-            'current_price': round(current_price, 2),
-            'current_value': round(actual_current_value, 2),
-            'gain_loss': round(actual_gain_loss, 2),
-            'return_pct': round(actual_return_pct, 2)
-        },
-        'alternatives': alternatives,
+        **summary,
         'history': {
             'dates': [d.isoformat() for d in dates],
             'actual': actual_history,
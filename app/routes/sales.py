@@ -8,17 +8,25 @@ from app.services.sale_service import (
     preview_fifo_assignment,
     InsufficientSharesError
 )
-from app.services.stock_data import validate_ticker, is_trading_day, get_price_on_date, invalidate_price_cache
+from app.services.stock_data import validate_ticker, is_trading_day, get_price_on_date, schedule_price_cache_invalidation
 from datetime import datetime
+from sqlalchemy import select, bindparam
 
 sales_bp = Blueprint('sales', __name__)
 
+# Built once so SQLAlchemy's compiled statement cache is reused across requests
+_sales_for_user = (
+    select(Sale)
+    .where(Sale.user_id == bindparam('uid'))
+    .order_by(Sale.sale_date.desc())
+)
+
 
 @sales_bp.route('/sales', methods=['GET'])
 @login_required
 def get_sales():
     """Get all sales for the current user."""
-    sales = Sale.query.filter_by(user_id=current_user.id).order_by(Sale.sale_date.desc()).all()
+    sales = db.session.scalars(_sales_for_user, {'uid': current_user.id}).all()
     return jsonify([s.to_dict() for s in sales])
 
 
@@ -131,8 +139,8 @@ def create_sale():
             db.session.rollback()
             return jsonify({'error': str(e)}), 400
 
-    # Invalidate price cache to ensure fresh prices on next fetch
-    invalidate_price_cache()
+    # Invalidate price cache once the response is sent to ensure fresh prices on next fetch
+    schedule_price_cache_invalidation()
 
     return jsonify(sale.to_dict()), 201
 
@@ -148,8 +156,8 @@ def delete_sale(id):
     db.session.delete(sale)
     db.session.commit()
 
-    # Invalidate price cache to ensure fresh prices on next fetch
-    invalidate_price_cache()
+    # Invalidate price cache once the response is sent to ensure fresh prices on next fetch
+    schedule_price_cache_invalidation()
 
     return jsonify({'message': 'Sale deleted'}), 200
 
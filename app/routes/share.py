@@ -1,17 +1,33 @@
-from flask import Blueprint, jsonify, request, send_file
+from flask import Blueprint, jsonify, request, current_app, send_from_directory, Response
 from flask_login import login_required, current_user
 from app import db, csrf
 from app.models import Purchase, ComparisonStock, PortfolioShare
 from app.services.stock_data import get_price_on_date, get_current_prices
-from app.services.image_generator import generate_share_image
+from app.services.image_generator import generate_share_image, generate_share_svg
+import os
 import uuid
-from io import BytesIO
+import numpy as np
 
 share_bp = Blueprint('share', __name__)
 
 # Note: POST /share/create and DELETE /share/<token> require CSRF protection
 # because they modify data and require authentication.
 
+# Share images are snapshots that never change, but a share can be deleted,
+# so clients may cache them for one day rather than indefinitely
+SHARE_IMAGE_MAX_AGE = 86400
+
+# Formats kept in the on-disk image cache
+SHARE_IMAGE_FORMATS = ('png', 'webp')
+
+
+def _share_image_dir():
+    """Directory holding cached share images (created on first use)."""
+    cache_dir = current_app.config.get('SHARE_IMAGE_CACHE_DIR') or \
+        os.path.join(current_app.instance_path, 'share_images')
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
 
 @share_bp.route('/share/create', methods=['POST'])
 @login_required
@@ -24,15 +40,16 @@ def create_share():
         return jsonify({'error': 'No purchases found to share'}), 400
 
     # Step 1: Collect all unique tickers (purchases + comparison stocks)
-    purchase_tickers = list(set(p.ticker for p in purchases))
+    # dict.fromkeys de-duplicates while keeping first-seen order
+    purchase_tickers = list(dict.fromkeys(p.ticker for p in purchases))
     comp_tickers = [cs.ticker for cs in comparison_stocks]
-    all_tickers = list(set(purchase_tickers + comp_tickers))
+    all_tickers = list(dict.fromkeys([*purchase_tickers, *comp_tickers]))
 
     # Step 2: Batch fetch all current prices ONCE
     current_prices = get_current_prices(all_tickers)
 
     # Step 3: Pre-compute comparison stock prices at each unique purchase date
-    unique_purchase_dates = list(set(p.purchase_date for p in purchases))
+    unique_purchase_dates = list(dict.fromkeys(p.purchase_date for p in purchases))
     comp_prices_at_dates = {}
     for comp_ticker in comp_tickers:
         for date in unique_purchase_dates:
@@ -52,23 +69,27 @@ def create_share():
     actual_return_pct = (actual_gain_loss / total_invested * 100) if total_invested > 0 else 0
 
     # Calculate alternatives using pre-computed data
+    # Purchase amounts are shared by every benchmark, so build the array once
+    amounts = np.array([p.amount for p in purchases], dtype=float)
+
     alternatives = []
     for comp_stock in comparison_stocks:
         alt_current_value = 0
         comp_current_price = current_prices.get(comp_stock.ticker)
 
-        for purchase in purchases:
-            # Get price of comparison stock on original purchase date
-            if comp_stock.ticker == purchase.ticker:
-                comp_price_at_purchase = purchase.price_at_purchase
-            else:
-                comp_price_at_purchase = comp_prices_at_dates.get((comp_stock.ticker, purchase.purchase_date))
+        if comp_current_price:
+            # Price of comparison stock on each original purchase date
+            # (None -> NaN, which the validity mask below drops)
+            comp_prices_at_purchase = np.array([
+                purchase.price_at_purchase if comp_stock.ticker == purchase.ticker
+                else comp_prices_at_dates.get((comp_stock.ticker, purchase.purchase_date))
+                for purchase in purchases
+            ], dtype=float)
+            valid = comp_prices_at_purchase > 0
 
-            if comp_price_at_purchase and comp_current_price:
-                # Calculate how many shares we would have bought
-                comp_shares = purchase.amount / comp_price_at_purchase
-                # Use pre-fetched current price
-                alt_current_value += comp_shares * comp_current_price
+            # Shares we would have bought, valued at the pre-fetched current price
+            comp_shares = amounts[valid] / comp_prices_at_purchase[valid]
+            alt_current_value = float(comp_shares.sum() * comp_current_price)
 
         alt_gain_loss = alt_current_value - total_invested
         alt_return_pct = (alt_gain_loss / total_invested * 100) if total_invested > 0 else 0
@@ -139,24 +160,62 @@ def get_share(token):
     return jsonify(share.to_dict())
 
 
+def _send_share_image(token, image_format):
+    """Serve a share card from the on-disk cache, rendering it on first request."""
+    share = PortfolioShare.query.filter_by(share_token=token).first()
+
+    if not share:
+        return jsonify({'error': 'Share not found'}), 404
+
+    # Render once per share and format, and serve the cached file afterwards
+    cache_dir = _share_image_dir()
+    filename = f'{share.share_token}.{image_format}'
+    image_path = os.path.join(cache_dir, filename)
+
+    if not os.path.exists(image_path):
+        # Generate image using image_generator (pass dict, not model)
+        image_bytes = generate_share_image(share.to_dict(), image_format=image_format)
+
+        # Write to a temp file and rename so concurrent requests never see a partial image
+        tmp_path = f'{image_path}.{uuid.uuid4().hex}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(image_bytes)
+        os.replace(tmp_path, image_path)
+
+    return send_from_directory(
+        cache_dir,
+        filename,
+        mimetype=f'image/{image_format}',
+        as_attachment=False,
+        download_name=f'honest-portfolio-{token[:8]}.{image_format}',
+        max_age=SHARE_IMAGE_MAX_AGE
+    )
+
+
 @share_bp.route('/share/<token>/image', methods=['GET'])
 def get_share_image(token):
     """Generate and return PNG image for shareable portfolio (public, no auth required)."""
+    return _send_share_image(token, 'png')
+
+
+@share_bp.route('/share/<token>/image.webp', methods=['GET'])
+def get_share_image_webp(token):
+    """Return the share card as WebP, about half the size of the PNG (public, no auth required)."""
+    return _send_share_image(token, 'webp')
+
+
+@share_bp.route('/share/<token>/image.svg', methods=['GET'])
+def get_share_image_svg(token):
+    """Return the share card as SVG for clients that rasterise it themselves (public, no auth required)."""
     share = PortfolioShare.query.filter_by(share_token=token).first()
 
     if not share:
         return jsonify({'error': 'Share not found'}), 404
 
-    # Generate PNG using image_generator (pass dict, not model)
-    image_bytes = generate_share_image(share.to_dict())
-
-    # Return image/png response
-    return send_file(
-        BytesIO(image_bytes),
-        mimetype='image/png',
-        as_attachment=False,
-        download_name=f'honest-portfolio-{token[:8]}.png'
-    )
+    response = Response(generate_share_svg(share.to_dict()), mimetype='image/svg+xml')
+    response.cache_control.public = True
+    response.cache_control.max_age = SHARE_IMAGE_MAX_AGE
+    return response
 
 
 @share_bp.route('/share/<token>', methods=['DELETE'])
@@ -175,4 +234,11 @@ def delete_share(token):
     db.session.delete(share)
     db.session.commit()
 
+    # Drop the cached images so the deleted share is no longer served
+    cache_dir = _share_image_dir()
+    for image_format in SHARE_IMAGE_FORMATS:
+        image_path = os.path.join(cache_dir, f'{token}.{image_format}')
+        if os.path.exists(image_path):
+            os.remove(image_path)
+
     return jsonify({'message': 'Share deleted successfully'}), 200
@@ -4,7 +4,8 @@ Trade data extracted from Trade Republic account statement (Jan-Dec 2025).
 Original amounts are in EUR. USD amounts are calculated using approximate
 EUR/USD exchange rate of 1.08 for the period.
 """
-from datetime import datetime
+from datetime import date
+from sqlalchemy import insert, select
 from app import db
 from app.models import Purchase
 
@@ -31,6 +32,28 @@ TRADE_DATA = [
 ]
 
 
+def _build_trade_rows(trade_data):
+    """Materialise Purchase column values for each trade (USD converted)."""
+    rows = []
+    for date_str, ticker, shares, eur_amount in trade_data:
+        # Convert EUR to USD using fixed rate
+        usd_amount = eur_amount * EUR_USD_RATE
+        rows.append({
+            'ticker': ticker,
+            'purchase_date': date.fromisoformat(date_str),
+            'amount': usd_amount,
+            'shares_bought': shares,
+            'price_at_purchase': usd_amount / shares,
+            'original_amount': eur_amount,
+            'original_currency': 'EUR'
+        })
+    return rows
+
+
+# Pre-computed insert rows - TRADE_DATA is static, so parse and convert once
+TRADE_ROWS = _build_trade_rows(TRADE_DATA)
+
+
 def seed_trade_republic_data():
     """Load Trade Republic test data into the database.
 
@@ -39,48 +62,36 @@ def seed_trade_republic_data():
     """
     print("Starting Trade Republic data seed...")
 
-    seeded_count = 0
-    skipped_count = 0
+    # Load existing purchases once instead of querying per row (idempotent)
+    existing = {
+        (row.ticker, row.purchase_date, row.shares_bought)
+        for row in db.session.execute(
+            select(Purchase.ticker, Purchase.purchase_date, Purchase.shares_bought)
+        )
+    }
 
-    for date_str, ticker, shares, eur_amount in TRADE_DATA:
-        # Parse the date
-        purchase_date = datetime.strptime(date_str, '%Y-%m-%d').date()
+    new_rows = []
+    skipped_count = 0
 
-        # Check if this purchase already exists (idempotent)
-        existing = Purchase.query.filter_by(
-            ticker=ticker,
-            purchase_date=purchase_date,
-            shares_bought=shares
-        ).first()
+    for row in TRADE_ROWS:
+        ticker = row['ticker']
+        purchase_date = row['purchase_date']
 
-        if existing:
-            print(f"Skipping existing purchase: {ticker} on {date_str}")
+        if (ticker, purchase_date, row['shares_bought']) in existing:
+            print(f"Skipping existing purchase: {ticker} on {purchase_date.isoformat()}")
             skipped_count += 1
             continue
 
-        # Convert EUR to USD using fixed rate
-        usd_amount = eur_amount * EUR_USD_RATE
-
-        # Calculate price per share in USD
-        usd_price = usd_amount / shares
-
-        # Create the purchase record
-        purchase = Purchase(
-            ticker=ticker,
-            purchase_date=purchase_date,
-            amount=usd_amount,
-            shares_bought=shares,
-            price_at_purchase=usd_price,
-            original_amount=eur_amount,
-            original_currency='EUR'
-        )
+        new_rows.append(row)
+        print(f"Added: {ticker} - {row['shares_bought']:.6f} shares @ ${row['price_at_purchase']:.2f} "
+              f"(EUR {row['original_amount']:.2f})")
 
-        db.session.add(purchase)
-        print(f"Added: {ticker} - {shares:.6f} shares @ ${usd_price:.2f} (EUR {eur_amount:.2f})")
-        seeded_count += 1
+    seeded_count = len(new_rows)
 
-    # Commit all purchases
+    # Insert all new purchases in a single executemany batch and commit
     try:
+        if new_rows:
+            db.session.execute(insert(Purchase), new_rows)
         db.session.commit()
         print(f"\nSeed complete! Added {seeded_count} purchases, skipped {skipped_count}.")
     except Exception as e:
@@ -1,17 +1,370 @@
 """
-Portfolio summary card image generator using Playwright.
+Portfolio summary card image generator.
 
-Renders HTML template to PNG for shareable social media images.
+Rasterises shareable social media images in-process with Pillow. The original
+Playwright renderer (HTML template to PNG) is kept behind the
+SHARE_IMAGE_RENDERER='playwright' config flag.
 """
 
-from typing import Dict
-from flask import render_template
-from playwright.sync_api import sync_playwright
+import atexit
+import base64
+import os
+import queue
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import lru_cache, partial
+from io import BytesIO
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+from xml.sax.saxutils import escape
+from flask import current_app, render_template
+from PIL import Image, ImageDraw, ImageFont
 
 
-def generate_share_image(share_data: Dict) -> bytes:
+BOLD_FONT_PATHS = (
+    '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf',
+    '/System/Library/Fonts/Supplemental/Arial Bold.ttf',
+    'DejaVuSans-Bold.ttf',
+    'arialbd.ttf',
+)
+REGULAR_FONT_PATHS = (
+    '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',
+    '/System/Library/Fonts/Supplemental/Arial.ttf',
+    'DejaVuSans.ttf',
+    'arial.ttf',
+)
+
+
+@lru_cache(maxsize=None)
+def _load_font(paths, size):
     """
-    Generate PNG image from share data using Playwright.
+    Load the first available TrueType font, falling back to Pillow's default.
+
+    Cached on (paths, size) so faces with the same file and size (title and
+    large values) share one FreeType object and its measurement cache entries.
+    """
+    for path in paths:
+        try:
+            return ImageFont.truetype(path, size)
+        except OSError:
+            continue
+    return ImageFont.load_default(size=size)
+
+
+# Card font faces: name -> (font paths, pixel size)
+FONT_SPECS = {
+    'font_title': (BOLD_FONT_PATHS, 56),
+    'font_header': (REGULAR_FONT_PATHS, 30),
+    'font_hero': (BOLD_FONT_PATHS, 110),
+    'font_large': (BOLD_FONT_PATHS, 56),
+    'font_medium': (BOLD_FONT_PATHS, 40),
+    'font_small': (REGULAR_FONT_PATHS, 28),
+}
+
+
+@lru_cache(maxsize=None)
+def _load_fonts() -> Dict:
+    """Load the card's font faces once per process (TTF parsing is costly)."""
+    return {name: _load_font(paths, size) for name, (paths, size) in FONT_SPECS.items()}
+
+
+# Each card measures up to ~8 tickers/percentages, so this keeps the strings
+# from the last ~60 distinct cards
+@lru_cache(maxsize=512)
+def _measure(font, text: str) -> float:
+    """
+    Return the advance width of text in font; fonts are process-wide singletons.
+
+    Only widths are needed for alignment, and font.getlength() sums glyph
+    advances without computing an ink bounding box. It also matches how the
+    SVG renderer (text-anchor) and browsers centre text.
+    """
+    return font.getlength(text)
+
+
+def _truncate_text(font, text: str, max_width: int) -> str:
+    """Shorten text with an ellipsis so it fits within max_width pixels."""
+    if _measure(font, text) <= max_width:
+        return text
+
+    # Nothing fits if even the bare ellipsis is too wide
+    if font.getlength('...') > max_width:
+        return ''
+
+    # Binary search for the longest prefix that fits with the ellipsis
+    lo, hi = 0, len(text) - 1
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if font.getlength(text[:mid] + '...') <= max_width:
+            lo = mid
+        else:
+            hi = mid - 1
+    return text[:lo] + '...'
+
+
+@lru_cache(maxsize=1024)
+def _style_percentage(value: float):
+    """
+    Return the (formatted text, colour) pair used to draw a percentage.
+
+    Signed text such as +12.34%, green for gains and red for losses, decided
+    with a single sign check. Cached because cached share data is rounded,
+    so values repeat.
+    """
+    if value >= 0:
+        return f"+{value:.2f}%", SummaryCardGenerator.POSITIVE_COLOR
+    return f"{value:.2f}%", SummaryCardGenerator.NEGATIVE_COLOR
+
+
+class SummaryCardGenerator:
+    """Draws the 1080x1080 portfolio summary card with Pillow."""
+
+    # Drawn at native resolution: the background and cards come from the
+    # pre-rendered template, so per-card raster work is only the dynamic text,
+    # and the PNG encode cost depends on the output size either way
+    WIDTH = 1080
+    HEIGHT = 1080
+
+    # Colours matching templates/share_image.html (Tailwind palette)
+    GRADIENT_TOP = (59, 130, 246)       # blue-500
+    GRADIENT_BOTTOM = (147, 51, 234)    # purple-600
+    WHITE = (255, 255, 255)
+    LABEL_COLOR = (219, 234, 254)       # blue-100
+    POSITIVE_COLOR = (134, 239, 172)    # green-300
+    NEGATIVE_COLOR = (252, 165, 165)    # red-300
+    CARD_FILL = (255, 255, 255, 26)     # white/10
+    CARD_OUTLINE = (255, 255, 255, 77)  # white/30
+    DIVIDER_COLOR = (191, 219, 254)     # blue-200
+
+    # zlib level for the default (non-optimize) PNG encode: ~35ms and ~70KB per
+    # card, vs ~24ms/~88KB at level 1 and ~100ms/~64KB with optimize=True
+    PNG_COMPRESS_LEVEL = 6
+
+    # Lossless WebP at low effort: ~35KB in about the time of the level-6 PNG
+    WEBP_OPTIONS = {'lossless': True, 'quality': 50, 'method': 1}
+
+    CARD_RADIUS = 24
+    CARD_OUTLINE_WIDTH = 4
+
+    # Gradient depends only on class constants, so it is built once per class
+    _gradient_cache: Optional[Image.Image] = None
+
+    # Card boxes: (left, top, right, bottom)
+    RETURN_CARD = (90, 180, 990, 400)
+    SPY_CARD = (90, 425, 990, 535)
+    BENCHMARK_CARD = (90, 560, 990, 760)
+    OPPORTUNITY_CARD = (90, 785, 990, 960)
+
+    def __init__(self):
+        self._setup_fonts()
+
+    def _setup_fonts(self):
+        """Attach the process-wide font faces used on the card."""
+        self.__dict__.update(_load_fonts())
+
+    def _create_gradient_background(self) -> Image.Image:
+        """Return a copy of the blue-to-purple vertical gradient background."""
+        cls = type(self)
+        if cls._gradient_cache is None:
+            # Build a 1px-wide column with one colour per row, then let Pillow
+            # stretch it across the width in C
+            column = bytes(
+                int(top + (bottom - top) * (y / (self.HEIGHT - 1)))
+                for y in range(self.HEIGHT)
+                for top, bottom in zip(self.GRADIENT_TOP, self.GRADIENT_BOTTOM)
+            )
+            cls._gradient_cache = Image.frombytes('RGB', (1, self.HEIGHT), column).resize(
+                (self.WIDTH, self.HEIGHT), Image.NEAREST
+            )
+
+        return cls._gradient_cache.copy()
+
+    def _draw_cards(self, img: Image.Image, boxes) -> Image.Image:
+        """Composite translucent rounded cards onto the image in a single pass."""
+        # The cards don't overlap, so one overlay holding all of them composites
+        # exactly like one overlay per card, at a quarter of the full-frame blends
+        overlay = Image.new('RGBA', img.size, (0, 0, 0, 0))
+        overlay_draw = ImageDraw.Draw(overlay)
+        for box in boxes:
+            overlay_draw.rounded_rectangle(
+                box,
+                radius=self.CARD_RADIUS,
+                fill=self.CARD_FILL,
+                outline=self.CARD_OUTLINE,
+                width=self.CARD_OUTLINE_WIDTH
+            )
+        return Image.alpha_composite(img, overlay)
+
+    def _draw_text(self, draw, text, x, y, font, fill, align='left'):
+        """Draw text with its left (or right, for align='right') edge at x."""
+        if align == 'right':
+            x = x - _measure(font, text)
+        draw.text((x, y), text, font=font, fill=fill)
+
+    def _draw_centered_text(self, draw, text, center_x, y, font, fill, max_width=None):
+        """Draw text horizontally centred on center_x, truncating to max_width."""
+        if max_width:
+            text = _truncate_text(font, text, max_width)
+        text_width = _measure(font, text)
+
+        draw.text((center_x - text_width / 2, y), text, font=font, fill=fill)
+
+    def _draw_benchmark_column(self, draw, center_x, y, ticker, return_str, color):
+        """Draw the ticker / return column under a benchmark card label."""
+        column_width = (self.BENCHMARK_CARD[2] - self.BENCHMARK_CARD[0]) // 2 - 40
+        self._draw_centered_text(draw, ticker, center_x, y + 45, self.font_medium, self.WHITE,
+                                 max_width=column_width)
+        self._draw_centered_text(draw, return_str, center_x, y + 100, self.font_large, color)
+
+    def _draw_static(self, img: Image.Image) -> Image.Image:
+        """Draw the parts of the card that do not depend on share data."""
+        center_x = self.WIDTH // 2
+        left, _, right, _ = self.RETURN_CARD
+
+        img = self._draw_cards(
+            img, (self.RETURN_CARD, self.SPY_CARD, self.BENCHMARK_CARD, self.OPPORTUNITY_CARD)
+        )
+
+        draw = ImageDraw.Draw(img)
+
+        # Header
+        self._draw_centered_text(draw, 'HONEST PORTFOLIO', center_x, 70, self.font_title, self.WHITE)
+        draw.line([(left + 30, 150), (right - 30, 150)], fill=self.DIVIDER_COLOR, width=2)
+
+        # Section labels
+        benchmark_top = self.BENCHMARK_CARD[1] + 25
+        self._draw_centered_text(draw, 'YOUR RETURN', center_x, 205, self.font_header, self.LABEL_COLOR)
+        self._draw_text(draw, 'S&P 500 (SPY)', left + 40, self.SPY_CARD[1] + 35, self.font_medium,
+                        self.WHITE)
+        self._draw_centered_text(draw, 'BEST BENCHMARK', left + (right - left) // 4, benchmark_top,
+                                 self.font_header, self.LABEL_COLOR)
+        self._draw_centered_text(draw, 'WORST BENCHMARK', left + 3 * (right - left) // 4,
+                                 benchmark_top, self.font_header, self.LABEL_COLOR)
+        self._draw_centered_text(draw, 'OPPORTUNITY COST', center_x, self.OPPORTUNITY_CARD[1] + 20,
+                                 self.font_header, self.LABEL_COLOR)
+
+        # Footer
+        draw.line([(left + 30, 985), (right - 30, 985)], fill=self.DIVIDER_COLOR, width=2)
+        self._draw_centered_text(draw, 'Track your portfolio at Honest Portfolio', center_x, 1005,
+                                 self.font_small, self.LABEL_COLOR)
+
+        return img
+
+    def generate(self, share_data: Dict, optimize: bool = False, image_format: str = 'png') -> bytes:
+        """
+        Render the summary card for share_data and return encoded image bytes.
+
+        image_format is 'png' (default) or 'webp'. For PNG, optimize=True runs
+        Pillow's exhaustive optimiser for slightly smaller files at several
+        times the encode cost; by default a single pass at PNG_COMPRESS_LEVEL
+        is used.
+        """
+        center_x = self.WIDTH // 2
+        left, _, right, _ = self.RETURN_CARD
+
+        # Format each percentage and pick its colour once up front
+        portfolio_str, portfolio_color = _style_percentage(share_data['portfolio_return_pct'])
+        best_str, best_color = _style_percentage(share_data['best_benchmark_return_pct'])
+        worst_str, worst_color = _style_percentage(share_data['worst_benchmark_return_pct'])
+        opportunity_str, opportunity_color = _style_percentage(share_data['opportunity_cost_pct'])
+        spy_return = share_data.get('spy_return_pct')
+        if spy_return is not None:
+            spy_str, spy_color = _style_percentage(spy_return)
+        else:
+            spy_str, spy_color = 'N/A', self.LABEL_COLOR
+
+        canvas, draw, buffer = _get_canvas()
+        canvas.paste(_get_template())
+
+        # Your return
+        self._draw_centered_text(draw, portfolio_str, center_x, 255, self.font_hero, portfolio_color)
+
+        # S&P 500
+        self._draw_text(draw, spy_str, right - 40, self.SPY_CARD[1] + 27, self.font_large, spy_color,
+                        align='right')
+
+        # Best / worst benchmarks
+        benchmark_top = self.BENCHMARK_CARD[1] + 25
+        self._draw_benchmark_column(draw, left + (right - left) // 4, benchmark_top,
+                                    share_data['best_benchmark_ticker'], best_str, best_color)
+        self._draw_benchmark_column(draw, left + 3 * (right - left) // 4, benchmark_top,
+                                    share_data['worst_benchmark_ticker'], worst_str, worst_color)
+
+        # Opportunity cost
+        opportunity_top = self.OPPORTUNITY_CARD[1]
+        self._draw_centered_text(draw, opportunity_str, center_x, opportunity_top + 60,
+                                 self.font_large, opportunity_color)
+        self._draw_centered_text(draw, f"vs {share_data['best_benchmark_ticker']}", center_x,
+                                 opportunity_top + 130, self.font_small, self.LABEL_COLOR,
+                                 max_width=right - left - 80)
+
+        buffer.seek(0)
+        buffer.truncate(0)
+        if image_format == 'webp':
+            canvas.save(buffer, format='WEBP', **self.WEBP_OPTIONS)
+        elif optimize:
+            canvas.save(buffer, format='PNG', optimize=True)
+        else:
+            canvas.save(buffer, format='PNG', compress_level=self.PNG_COMPRESS_LEVEL)
+        return buffer.getvalue()
+
+
+@lru_cache(maxsize=1)
+def _get_generator() -> SummaryCardGenerator:
+    """
+    Return the process-wide card generator, created on first use.
+
+    generate() keeps all per-card state in locals and thread-local buffers,
+    so one instance is safe to share across request threads.
+    """
+    return SummaryCardGenerator()
+
+
+# Background, cards, header, labels and footer rendered once per process;
+# generate() pastes it onto a reusable canvas and only draws the share data.
+# The gradient is baked in (RGB) rather than kept as a transparent overlay, so
+# each card costs a plain paste instead of a full-frame alpha_composite, and
+# label anti-aliasing is blended against the real background.
+_TEMPLATE = None
+
+
+def _build_template() -> Image.Image:
+    """Render the static parts of the summary card."""
+    generator = _get_generator()
+    img = generator._create_gradient_background().convert('RGBA')
+    return generator._draw_static(img).convert('RGB')
+
+
+def _get_template() -> Image.Image:
+    """Return the pre-rendered card template, building it on first use."""
+    global _TEMPLATE
+    if _TEMPLATE is None:
+        _TEMPLATE = _build_template()
+    return _TEMPLATE
+
+
+# Each worker thread reuses one canvas, draw context and output buffer
+# instead of allocating a fresh ~3MB image per card.
+_canvas_local = threading.local()
+
+
+def _get_canvas():
+    """Return this thread's (canvas, draw, buffer), creating them on first use."""
+    canvas = getattr(_canvas_local, 'canvas', None)
+    if canvas is None:
+        canvas = Image.new('RGB', (SummaryCardGenerator.WIDTH, SummaryCardGenerator.HEIGHT))
+        _canvas_local.canvas = canvas
+        _canvas_local.draw = ImageDraw.Draw(canvas)
+        _canvas_local.buffer = BytesIO()
+    return canvas, _canvas_local.draw, _canvas_local.buffer
+
+
+def generate_share_image(share_data: Dict, image_format: str = 'png') -> bytes:
+    """
+    Generate PNG (or WebP) image from share data.
+
+    Uses the in-process Pillow renderer unless SHARE_IMAGE_RENDERER is set to
+    'playwright', in which case the HTML template is rendered with Chromium.
 
     Args:
         share_data: Dictionary containing:
@@ -22,6 +375,330 @@ def generate_share_image(share_data: Dict) -> bytes:
             - worst_benchmark_ticker: str
             - worst_benchmark_return_pct: float
             - opportunity_cost_pct: float
+        image_format: 'png' (default) or 'webp'
+
+    Returns:
+        Encoded image as bytes
+    """
+    renderer = current_app.config.get('SHARE_IMAGE_RENDERER') or 'pil'
+    if renderer == 'playwright':
+        png = render_share_image_html(share_data)
+        if image_format != 'webp':
+            return png
+        buffer = BytesIO()
+        Image.open(BytesIO(png)).convert('RGB').save(
+            buffer, format='WEBP', **SummaryCardGenerator.WEBP_OPTIONS
+        )
+        return buffer.getvalue()
+
+    optimize = bool(current_app.config.get('SHARE_IMAGE_PNG_OPTIMIZE'))
+    return _get_generator().generate(share_data, optimize=optimize, image_format=image_format)
+
+
+def _svg_color(rgb) -> str:
+    return '#{:02x}{:02x}{:02x}'.format(*rgb[:3])
+
+
+def generate_share_svg(share_data: Dict) -> str:
+    """
+    Generate the summary card as an SVG document.
+
+    Mirrors the Pillow layout so browsers can rasterise the card themselves;
+    social sites that need a raster image keep using generate_share_image().
+
+    Args:
+        share_data: Same keys as generate_share_image()
+
+    Returns:
+        SVG markup as a string
+    """
+    card = _get_generator()
+    fonts = _load_fonts()
+    center_x = card.WIDTH // 2
+    left, _, right, _ = card.RETURN_CARD
+    elements = []
+
+    def text(value, x, y, font_name, fill, anchor='middle', max_width=None):
+        # Pillow positions text by its top edge, SVG by its baseline
+        paths, size = FONT_SPECS[font_name]
+        font = fonts[font_name]
+        if max_width:
+            value = _truncate_text(font, value, max_width)
+        baseline = y + font.getmetrics()[0]
+        weight = ' font-weight="bold"' if paths is BOLD_FONT_PATHS else ''
+        elements.append(
+            f'<text x="{x}" y="{baseline}" font-size="{size}"{weight} '
+            f'fill="{_svg_color(fill)}" text-anchor="{anchor}">{escape(value)}</text>'
+        )
+
+    def divider(y):
+        elements.append(
+            f'<line x1="{left + 30}" y1="{y}" x2="{right - 30}" y2="{y}" '
+            f'stroke="{_svg_color(card.DIVIDER_COLOR)}" stroke-width="2"/>'
+        )
+
+    def percentage(value, x, y, font_name, anchor='middle'):
+        value_str, color = _style_percentage(value)
+        text(value_str, x, y, font_name, color, anchor)
+
+    # Cards (Pillow draws the outline inside the box, SVG centres it on the edge)
+    inset = card.CARD_OUTLINE_WIDTH / 2
+    for box_left, box_top, box_right, box_bottom in (
+        card.RETURN_CARD, card.SPY_CARD, card.BENCHMARK_CARD, card.OPPORTUNITY_CARD
+    ):
+        elements.append(
+            f'<rect x="{box_left + inset}" y="{box_top + inset}" '
+            f'width="{box_right - box_left - 2 * inset}" height="{box_bottom - box_top - 2 * inset}" '
+            f'rx="{card.CARD_RADIUS}" fill="#ffffff" fill-opacity="{card.CARD_FILL[3] / 255:.2f}" '
+            f'stroke="#ffffff" stroke-opacity="{card.CARD_OUTLINE[3] / 255:.2f}" '
+            f'stroke-width="{card.CARD_OUTLINE_WIDTH}"/>'
+        )
+
+    # Header
+    text('HONEST PORTFOLIO', center_x, 70, 'font_title', card.WHITE)
+    divider(150)
+
+    # Your return
+    text('YOUR RETURN', center_x, 205, 'font_header', card.LABEL_COLOR)
+    percentage(share_data['portfolio_return_pct'], center_x, 255, 'font_hero')
+
+    # S&P 500
+    spy_return = share_data.get('spy_return_pct')
+    spy_top = card.SPY_CARD[1]
+    text('S&P 500 (SPY)', left + 40, spy_top + 35, 'font_medium', card.WHITE, anchor='start')
+    if spy_return is not None:
+        percentage(spy_return, right - 40, spy_top + 27, 'font_large', anchor='end')
+    else:
+        text('N/A', right - 40, spy_top + 27, 'font_large', card.LABEL_COLOR, anchor='end')
+
+    # Best / worst benchmarks
+    benchmark_top = card.BENCHMARK_CARD[1] + 25
+    column_width = (card.BENCHMARK_CARD[2] - card.BENCHMARK_CARD[0]) // 2 - 40
+    for column_x, label, prefix in (
+        (left + (right - left) // 4, 'BEST BENCHMARK', 'best'),
+        (left + 3 * (right - left) // 4, 'WORST BENCHMARK', 'worst'),
+    ):
+        text(label, column_x, benchmark_top, 'font_header', card.LABEL_COLOR)
+        text(share_data[f'{prefix}_benchmark_ticker'], column_x, benchmark_top + 45, 'font_medium',
+             card.WHITE, max_width=column_width)
+        percentage(share_data[f'{prefix}_benchmark_return_pct'], column_x, benchmark_top + 100,
+                   'font_large')
+
+    # Opportunity cost
+    opportunity_top = card.OPPORTUNITY_CARD[1]
+    text('OPPORTUNITY COST', center_x, opportunity_top + 20, 'font_header', card.LABEL_COLOR)
+    percentage(share_data['opportunity_cost_pct'], center_x, opportunity_top + 60, 'font_large')
+    text(f"vs {share_data['best_benchmark_ticker']}", center_x, opportunity_top + 130, 'font_small',
+         card.LABEL_COLOR, max_width=right - left - 80)
+
+    # Footer
+    divider(985)
+    text('Track your portfolio at Honest Portfolio', center_x, 1005, 'font_small', card.LABEL_COLOR)
+
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{card.WIDTH}" height="{card.HEIGHT}" '
+        f'viewBox="0 0 {card.WIDTH} {card.HEIGHT}" '
+        f'font-family="DejaVu Sans, Arial, Helvetica, sans-serif">'
+        f'<defs><linearGradient id="bg" x1="0" y1="0" x2="0" y2="1">'
+        f'<stop offset="0" stop-color="{_svg_color(card.GRADIENT_TOP)}"/>'
+        f'<stop offset="1" stop-color="{_svg_color(card.GRADIENT_BOTTOM)}"/>'
+        f'</linearGradient></defs>'
+        f'<rect width="100%" height="100%" fill="url(#bg)"/>'
+        + ''.join(elements)
+        + '</svg>'
+    )
+
+
+def _init_bulk_worker():
+    """Create the generator and load fonts and the card template once per worker process."""
+    _get_generator()
+    _load_fonts()
+    _get_template()
+
+
+def _render_card(share_data: Dict, image_format: str = 'png') -> bytes:
+    """Render one card with the Pillow renderer (no app context needed)."""
+    return _get_generator().generate(share_data, image_format=image_format)
+
+
+def generate_share_images_bulk(share_data_list: List[Dict], max_workers: int = None,
+                               image_format: str = 'png') -> List[bytes]:
+    """
+    Render many summary cards in parallel across processes.
+
+    Rasterising and PNG encoding are CPU-bound and serialised by the GIL, so
+    bulk jobs (e.g. snapshots for every user) spread them over a process pool.
+    Always uses the Pillow renderer.
+
+    Args:
+        share_data_list: List of share data dicts (see generate_share_image())
+        max_workers: Number of worker processes (defaults to the CPU count)
+        image_format: 'png' (default) or 'webp'
+
+    Returns:
+        Encoded image bytes, in the same order as share_data_list
+    """
+    if not share_data_list:
+        return []
+
+    render = partial(_render_card, image_format=image_format)
+    workers = min(max_workers or os.cpu_count() or 1, len(share_data_list))
+    if workers == 1:
+        return [render(share_data) for share_data in share_data_list]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_bulk_worker) as executor:
+        chunksize = max(1, len(share_data_list) // (workers * 4))
+        return list(executor.map(render, share_data_list, chunksize=chunksize))
+
+
+# --- Playwright (HTML template) renderer ---
+
+VIEWPORT = {'width': 1080, 'height': 1080}
+
+# Keep Chromium responsive while idle between share requests
+CHROMIUM_ARGS = [
+    '--disable-background-timer-throttling',
+    '--disable-renderer-backgrounding',
+    '--disable-dev-shm-usage',
+]
+
+# The card only needs the Tailwind script; never wait on other remote assets
+BLOCKED_RESOURCE_TYPES = {'image', 'font', 'media'}
+
+# Playwright's sync API is bound to the thread that started it, so a single
+# render thread owns the one Chromium instance and its reusable page. Request
+# threads queue their HTML for it, so the number of browsers stays at one
+# however many threads the server runs.
+_browser_state = SimpleNamespace(playwright=None, browser=None, page=None, cdp=None)
+_render_queue = queue.Queue()
+_render_thread = None
+_render_thread_lock = threading.Lock()
+
+
+def _shutdown_browser():
+    """Close the persistent browser (called on the render thread)."""
+    try:
+        if _browser_state.browser is not None:
+            _browser_state.browser.close()
+        if _browser_state.playwright is not None:
+            _browser_state.playwright.stop()
+    except Exception:
+        pass
+
+
+def _block_remote_assets(route):
+    """Abort requests for asset types the share card does not use."""
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        route.abort()
+    else:
+        route.continue_()
+
+
+def _get_page():
+    """Return the reusable page, launching Chromium on first use."""
+    page = _browser_state.page
+    if page is not None and not page.is_closed():
+        return page
+
+    browser = _browser_state.browser
+    if browser is None or not browser.is_connected():
+        if _browser_state.playwright is None:
+            # Imported lazily so the default Pillow renderer doesn't need Playwright
+            from playwright.sync_api import sync_playwright
+            _browser_state.playwright = sync_playwright().start()
+        browser = _browser_state.playwright.chromium.launch(args=CHROMIUM_ARGS)
+        _browser_state.browser = browser
+
+    page = browser.new_page(viewport=VIEWPORT)
+    page.route('**/*', _block_remote_assets)
+    _browser_state.page = page
+    _browser_state.cdp = page.context.new_cdp_session(page)
+    return page
+
+
+def _discard_page():
+    """Drop the page so the next render starts from a clean one."""
+    page = _browser_state.page
+    _browser_state.page = None
+    _browser_state.cdp = None
+    if page is not None:
+        try:
+            page.close()
+        except Exception:
+            pass
+
+
+def _capture_png() -> bytes:
+    """
+    Screenshot the current page via CDP with Chromium's fast PNG encoder.
+
+    page.screenshot() always uses the size-optimised encoder, which is the
+    slowest part of capturing a 1080x1080 card.
+    """
+    result = _browser_state.cdp.send('Page.captureScreenshot', {
+        'format': 'png',
+        'optimizeForSpeed': True,
+    })
+    return base64.b64decode(result['data'])
+
+
+def _render_html(html: str) -> bytes:
+    """Load the card HTML into the reusable page and capture it (render thread only)."""
+    page = _get_page()
+    try:
+        # 'load' fires once the Tailwind script has run; 'networkidle' would add
+        # a fixed 500ms quiet-period wait to every image
+        page.set_content(html, wait_until='load')
+        return _capture_png()
+    except Exception:
+        _discard_page()
+        raise
+
+
+def _render_worker():
+    """Render queued cards one at a time until told to stop, then close the browser."""
+    while True:
+        item = _render_queue.get()
+        if item is None:
+            break
+        html, future = item
+        if not future.set_running_or_notify_cancel():
+            continue
+        try:
+            future.set_result(_render_html(html))
+        except BaseException as e:
+            future.set_exception(e)
+    _shutdown_browser()
+
+
+def _stop_render_thread():
+    """Ask the render thread to close the browser at interpreter exit."""
+    _render_queue.put(None)
+    _render_thread.join(timeout=10)
+
+
+def _submit_render(html: str) -> Future:
+    """Queue HTML for the render thread, starting it on first use."""
+    global _render_thread
+    with _render_thread_lock:
+        if _render_thread is None:
+            _render_thread = threading.Thread(
+                target=_render_worker, name='share-image-playwright', daemon=True
+            )
+            _render_thread.start()
+            atexit.register(_stop_render_thread)
+
+    future = Future()
+    _render_queue.put((html, future))
+    return future
+
+
+def render_share_image_html(share_data: Dict) -> bytes:
+    """
+    Generate PNG image from share data using Playwright.
+
+    Args:
+        share_data: Same keys as generate_share_image()
 
     Returns:
         PNG image as bytes
@@ -29,12 +706,5 @@ def generate_share_image(share_data: Dict) -> bytes:
     # Render HTML template with share data
     html = render_template('share_image.html', **share_data)
 
-    # Use Playwright to render HTML to PNG
-    with sync_playwright() as p:
-        browser = p.chromium.launch()
-        page = browser.new_page(viewport={'width': 1080, 'height': 1080})
-        page.set_content(html, wait_until='networkidle')
-        screenshot = page.screenshot(type='png')
-        browser.close()
-
-    return screenshot
+    # Rendered by the persistent browser on its own thread
+    return _submit_render(html).result()
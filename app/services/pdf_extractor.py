@@ -2,16 +2,216 @@
 PDF trade extraction service using Mistral OCR + OpenAI ChatGPT.
 """
 
-import base64
+import calendar
+import copy
+import hashlib
 import json
 import io
-from datetime import datetime
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, datetime
 from typing import Dict, List, Optional
 import fitz  # PyMuPDF
-from openai import OpenAI
+from openai import OpenAI, APIConnectionError
 from mistralai import Mistral
 from flask import current_app
 
+# In-process LRU of OCR and ChatGPT responses keyed by a SHA-256 of the exact
+# inputs (model, prompt, document), so re-uploading a statement skips the APIs
+RESPONSE_CACHE_SIZE = 128
+_response_cache = OrderedDict()  # {sha256 hex digest: result dict}
+_response_cache_lock = threading.Lock()
+
+
+def _cache_key(*parts) -> str:
+    """SHA-256 over length-prefixed parts (str or bytes)."""
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode('utf-8')
+        digest.update(len(part).to_bytes(8, 'big'))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+def _cache_get(key: str) -> Optional[Dict]:
+    """Return a copy of a cached response, or None on a miss."""
+    with _response_cache_lock:
+        value = _response_cache.get(key)
+        if value is None:
+            return None
+        _response_cache.move_to_end(key)
+    return copy.deepcopy(value)
+
+
+def _cache_set(key: str, value: Dict):
+    """Store a copy of a successful response, evicting the least recently used."""
+    value = copy.deepcopy(value)
+    with _response_cache_lock:
+        _response_cache[key] = value
+        _response_cache.move_to_end(key)
+        while len(_response_cache) > RESPONSE_CACHE_SIZE:
+            _response_cache.popitem(last=False)
+
+
+# Retry policy for transient OCR/LLM failures (rate limits, overload, 5xx)
+MAX_API_ATTEMPTS = 4
+RETRY_MIN_DELAY = 1.0   # seconds
+RETRY_MAX_DELAY = 20.0  # seconds
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+RETRYABLE_ERROR_PATTERN = re.compile(r"rate.?limit|overloaded|temporarily unavailable|\b50[234]\b", re.I)
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Whether an API error is transient and worth retrying."""
+    message = str(error)
+    if "quota" in message.lower():
+        # Exhausted quota won't recover within a request
+        return False
+    if isinstance(error, (APIConnectionError, ConnectionError, TimeoutError)):
+        return True
+    if getattr(error, 'status_code', None) in RETRYABLE_STATUS_CODES:
+        return True
+    return bool(RETRYABLE_ERROR_PATTERN.search(message))
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Seconds from the error's Retry-After header, if the server sent one."""
+    response = getattr(error, 'response', None) or getattr(error, 'raw_response', None)
+    headers = getattr(response, 'headers', None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
+
+class _ApiLimiter:
+    """
+    Process-wide bound on calls to one upstream API.
+
+    A semaphore caps in-flight calls and a monotonic-clock schedule spaces
+    dispatches at least 1/rps seconds apart, so concurrent uploads and the
+    per-page fan-out stay under the provider's rate limits.
+    """
+
+    def __init__(self, max_concurrency: int, rps: float):
+        self._semaphore = threading.BoundedSemaphore(max(1, max_concurrency))
+        self._interval = 1.0 / rps if rps > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_dispatch = 0.0
+
+    @contextmanager
+    def slot(self):
+        with self._semaphore:
+            if self._interval:
+                with self._lock:
+                    now = time.monotonic()
+                    dispatch_at = max(now, self._next_dispatch)
+                    self._next_dispatch = dispatch_at + self._interval
+                if dispatch_at > now:
+                    time.sleep(dispatch_at - now)
+            yield
+
+
+_limiters = {}  # {api name: _ApiLimiter}
+_limiters_lock = threading.Lock()
+
+
+def _get_limiter(api: str) -> _ApiLimiter:
+    """Return the limiter for 'mistral' or 'openai', configured from app config on first use."""
+    with _limiters_lock:
+        limiter = _limiters.get(api)
+        if limiter is None:
+            prefix = api.upper()
+            limiter = _ApiLimiter(
+                int(current_app.config.get(f'{prefix}_MAX_CONCURRENCY', 4)),
+                float(current_app.config.get(f'{prefix}_RPS', 0))
+            )
+            _limiters[api] = limiter
+        return limiter
+
+
+# API clients are shared across extractor instances (one per upload) so the
+# underlying HTTP connection pools, and their TLS sessions, stay warm
+_clients = {}  # {(api name, api key): client}
+_clients_lock = threading.Lock()
+
+
+def _get_shared_client(api: str, api_key: str, factory):
+    """Return the process-wide client for an API/key pair, building it with factory() on first use."""
+    with _clients_lock:
+        client = _clients.get((api, api_key))
+        if client is None:
+            client = factory()
+            _clients[(api, api_key)] = client
+        return client
+
+
+def _with_retries(call, description: str, limiter: Optional[_ApiLimiter] = None):
+    """
+    Run call(), retrying transient API failures with jittered exponential backoff.
+
+    Each attempt holds a limiter slot (if given); backoff waits do not.
+    Honours Retry-After when present. Non-retryable errors and the final
+    failed attempt are re-raised unchanged for the caller's error mapping.
+    """
+    for attempt in range(1, MAX_API_ATTEMPTS + 1):
+        try:
+            if limiter is None:
+                return call()
+            with limiter.slot():
+                return call()
+        except Exception as e:
+            if attempt == MAX_API_ATTEMPTS or not _is_retryable(e):
+                raise
+            delay = _retry_after(e)
+            if delay is None:
+                delay = random.uniform(RETRY_MIN_DELAY, RETRY_MIN_DELAY * 2 ** attempt)
+            delay = min(delay, RETRY_MAX_DELAY)
+            current_app.logger.warning(
+                f"{description} failed ({e}); retry {attempt}/{MAX_API_ATTEMPTS - 1} in {delay:.1f}s"
+            )
+            time.sleep(delay)
+
+
+# Numeric date layouts for PDFTradeExtractor._parse_date, each with the
+# (year, month, day) regex groups to try, in the same precedence as the
+# strptime formats they replace
+_NUMERIC_DATE_PATTERNS = [
+    # 2024-01-15, 2024/01/15
+    (re.compile(r"(\d{4})([-/])(\d{1,2})\2(\d{1,2})"), [(1, 3, 4)]),
+    # 01/15/2024 or 15/01/2024 (US month-first wins when both are valid)
+    (re.compile(r"(\d{1,2})([-/])(\d{1,2})\2(\d{4})"),
+     [(4, 1, 3), (4, 3, 1)]),
+    # 20240115
+    (re.compile(r"(\d{4})()(\d{2})(\d{2})"), [(1, 3, 4)]),
+]
+
+# Month-name layouts, as (pattern, (year, month, day) groups); the month
+# group is resolved through _MONTHS rather than strptime's %B/%b
+_NAMED_MONTH_DATE_PATTERNS = [
+    # January 15, 2024 / Jan 15, 2024
+    (re.compile(r"([A-Za-z]+)\s+(\d{1,2}),\s+(\d{4})"), (3, 1, 2)),
+    # 15 January 2024 / 15 Jan 2024
+    (re.compile(r"(\d{1,2})\s+([A-Za-z]+)\s+(\d{4})"), (3, 2, 1)),
+]
+
+_MONTHS = {
+    **{name.lower(): number for number, name in enumerate(calendar.month_name) if name},
+    **{abbr.lower(): number for number, abbr in enumerate(calendar.month_abbr) if abbr},
+}
+
+_FALLBACK_DATE_FORMATS = [
+    "%Y%m%d",             # 2024115 (unpadded month/day)
+]
+
 
 class PDFTradeExtractor:
     """Extracts trade data from PDF documents using Mistral OCR + ChatGPT."""
@@ -71,6 +271,20 @@ Example output:
     "notes": "Extracted from Fidelity monthly statement"
 }"""
 
+    OCR_MODEL = "mistral-ocr-latest"
+    EXTRACTION_MODEL = "gpt-4o"
+
+    # Upper bound on concurrent per-page ChatGPT extraction calls
+    MAX_CONCURRENT_EXTRACTIONS = 8
+
+    # Pages longer than this (~6k tokens) are split into several extraction
+    # calls so a dense page can't overflow the 2000-token response budget
+    MAX_CHUNK_CHARS = 24000
+
+    # Minimum non-whitespace characters every page needs for the PDF's own
+    # text layer to be used instead of OCR
+    NATIVE_TEXT_MIN_CHARS = 200
+
     def __init__(self):
         self.openai_client = None
         self.mistral_client = None
@@ -81,7 +295,9 @@ Example output:
             api_key = current_app.config.get('OPENAI_API_KEY')
             if not api_key:
                 raise ValueError("OPENAI_API_KEY not configured")
-            self.openai_client = OpenAI(api_key=api_key)
+            # Retries are handled by _with_retries so there is a single policy
+            self.openai_client = _get_shared_client(
+                'openai', api_key, lambda: OpenAI(api_key=api_key, max_retries=0))
         return self.openai_client
 
     def _get_mistral_client(self) -> Mistral:
@@ -90,9 +306,44 @@ Example output:
             api_key = current_app.config.get('MISTRAL_API_KEY')
             if not api_key:
                 raise ValueError("MISTRAL_API_KEY not configured")
-            self.mistral_client = Mistral(api_key=api_key)
+            self.mistral_client = _get_shared_client(
+                'mistral', api_key, lambda: Mistral(api_key=api_key))
         return self.mistral_client
 
+    def _try_native_text(self, pdf_bytes: bytes) -> Optional[dict]:
+        """
+        Read the PDF's embedded text layer with PyMuPDF.
+
+        Args:
+            pdf_bytes: PDF file content as bytes
+
+        Returns:
+            Dict in the same shape as pdf_to_markdown, or None if any page
+            lacks enough text (scanned/image-only) and OCR is needed
+        """
+        try:
+            with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+                page_texts = [page.get_text("text", sort=True) for page in doc]
+        except Exception as e:
+            current_app.logger.info(f"Could not read PDF text layer, falling back to OCR: {e}")
+            return None
+
+        if not page_texts:
+            return None
+        for text in page_texts:
+            if len("".join(text.split())) < self.NATIVE_TEXT_MIN_CHARS:
+                return None
+
+        markdown_text = "\n\n".join(page_texts)
+        current_app.logger.info(f"Read {len(markdown_text)} chars of native text from {len(page_texts)} pages")
+
+        return {
+            "markdown": markdown_text,
+            "page_markdowns": page_texts,
+            "pages": len(page_texts),
+            "metadata": None
+        }
+
     def pdf_to_markdown(self, pdf_bytes: bytes) -> dict:
         """
         Convert PDF to markdown using Mistral OCR API.
@@ -103,44 +354,72 @@ Example output:
         Returns:
             Dict with:
                 - markdown: Extracted markdown text
+                - page_markdowns: Markdown for each page (in page order)
                 - pages: Number of pages processed
                 - metadata: Optional OCR metadata
         """
+        cache_key = _cache_key(self.OCR_MODEL, pdf_bytes)
+        cached = _cache_get(cache_key)
+        if cached is not None:
+            current_app.logger.info("OCR result served from cache")
+            return cached
+
         try:
             client = self._get_mistral_client()
 
-            # Encode PDF to base64 data URI
-            base64_pdf = base64.b64encode(pdf_bytes).decode('utf-8')
-            data_uri = f"data:application/pdf;base64,{base64_pdf}"
-
-            # Call Mistral OCR API with base64-encoded PDF
-            ocr_response = client.ocr.process(
-                model="mistral-ocr-latest",
-                document={
-                    "type": "document_url",
-                    "document_url": data_uri
-                },
-                table_format="markdown",
-                include_image_base64=False
-            )
+            # Upload the raw PDF and reference it by id, rather than inlining
+            # it as a base64 data URI (which holds ~3 copies in memory)
+            limiter = _get_limiter('mistral')
+            uploaded = _with_retries(lambda: client.files.upload(
+                file={"file_name": "statement.pdf", "content": pdf_bytes},
+                purpose="ocr"
+            ), "Mistral file upload", limiter)
 
-            # Extract markdown (adjust field names based on actual API response)
-            markdown_text = getattr(ocr_response, 'text', '') or \
-                           getattr(ocr_response, 'content', '') or \
-                           str(ocr_response)
+            try:
+                ocr_response = _with_retries(lambda: client.ocr.process(
+                    model=self.OCR_MODEL,
+                    document={
+                        "type": "file",
+                        "file_id": uploaded.id
+                    },
+                    table_format="markdown",
+                    include_image_base64=False
+                ), "Mistral OCR", limiter)
+            finally:
+                # Statements are sensitive; don't leave them stored remotely
+                try:
+                    client.files.delete(file_id=uploaded.id)
+                except Exception as e:
+                    current_app.logger.warning(f"Failed to delete uploaded PDF {uploaded.id}: {e}")
+
+            # Mistral OCR returns markdown per page; fall back to a single blob
+            pages = getattr(ocr_response, 'pages', None) or []
+            page_markdowns = [page.markdown or '' for page in pages]
+
+            if any(md.strip() for md in page_markdowns):
+                markdown_text = "\n\n".join(md for md in page_markdowns if md.strip())
+            else:
+                # Extract markdown (adjust field names based on actual API response)
+                markdown_text = getattr(ocr_response, 'text', '') or \
+                               getattr(ocr_response, 'content', '') or \
+                               str(ocr_response)
+                page_markdowns = [markdown_text]
 
             if not markdown_text or markdown_text.strip() == "":
                 raise ValueError("OCR returned empty text. PDF may be corrupted or image-only.")
 
-            page_count = getattr(ocr_response, 'page_count', 1)
+            page_count = len(pages) or getattr(ocr_response, 'page_count', 1)
 
             current_app.logger.info(f"OCR extracted {len(markdown_text)} chars from {page_count} pages")
 
-            return {
+            result = {
                 "markdown": markdown_text,
+                "page_markdowns": page_markdowns,
                 "pages": page_count,
                 "metadata": getattr(ocr_response, 'metadata', None)
             }
+            _cache_set(cache_key, result)
+            return result
 
         except Exception as e:
             if "rate limit" in str(e).lower():
@@ -159,21 +438,37 @@ Example output:
         Returns:
             Dict with 'trades' array and optional 'notes'
         """
+        # Prompt is part of the key so prompt edits invalidate cached results.
+        # Whitespace is collapsed so OCR layout jitter on otherwise identical
+        # pages (e.g. the same boilerplate every month) still hits the cache;
+        # any difference in the actual text, including numbers, is a miss.
+        normalized_text = " ".join(markdown_text.split())
+        cache_key = _cache_key(self.EXTRACTION_MODEL, self.EXTRACTION_PROMPT, normalized_text)
+        cached = _cache_get(cache_key)
+        if cached is not None:
+            return cached
+
         try:
             client = self._get_openai_client()
 
             # Call OpenAI ChatGPT with text-only input
-            response = client.chat.completions.create(
-                model="gpt-4o",
+            response = _with_retries(lambda: client.chat.completions.create(
+                model=self.EXTRACTION_MODEL,
                 messages=[
+                    # Fixed instructions first as their own message, so the
+                    # prompt prefix is byte-identical on every call
+                    {
+                        "role": "system",
+                        "content": self.EXTRACTION_PROMPT
+                    },
                     {
                         "role": "user",
-                        "content": f"{self.EXTRACTION_PROMPT}\n\n--- DOCUMENT TEXT ---\n{markdown_text}"
+                        "content": markdown_text
                     }
                 ],
                 response_format={"type": "json_object"},
                 max_tokens=2000
-            )
+            ), "ChatGPT trade extraction", _get_limiter('openai'))
 
             content = response.choices[0].message.content
             result = json.loads(content)
@@ -181,6 +476,7 @@ Example output:
             if "trades" not in result:
                 result["trades"] = []
 
+            _cache_set(cache_key, result)
             return result
 
         except json.JSONDecodeError as e:
@@ -191,9 +487,15 @@ Example output:
                 raise ValueError("Trade extraction service temporarily busy. Try again in a few minutes.")
             raise ValueError(f"Failed to extract trades from markdown: {str(e)}")
 
-    def extract_trades_from_pdf(self, pdf_bytes: bytes) -> Dict:
+    def extract_trades_from_pdf(self, pdf_bytes: bytes, ocr_result: Optional[dict] = None) -> Dict:
         """
-        Extract all trades from a PDF using Mistral OCR + ChatGPT.
+        Extract all trades from a PDF using Mistral OCR (skipped for
+        text-based PDFs) + ChatGPT.
+
+        Args:
+            pdf_bytes: PDF file content as bytes
+            ocr_result: Optional result of an earlier pdf_to_markdown call for
+                the same PDF; when given, OCR is not run again
 
         Returns:
             Dict with trades, total_pages, notes, and errors
@@ -202,19 +504,34 @@ Example output:
         errors = []
 
         try:
-            # Step 1: Convert PDF to markdown using Mistral OCR
-            current_app.logger.info("Starting Mistral OCR extraction")
-            ocr_result = self.pdf_to_markdown(pdf_bytes)
+            # Step 1: Use the PDF's own text layer when it has one, otherwise
+            # convert PDF to markdown using Mistral OCR
+            if ocr_result is None:
+                ocr_result = self._try_native_text(pdf_bytes)
+            if ocr_result is None:
+                current_app.logger.info("Starting Mistral OCR extraction")
+                ocr_result = self.pdf_to_markdown(pdf_bytes)
             markdown_text = ocr_result["markdown"]
             total_pages = ocr_result["pages"]
 
-            # Step 2: Extract trades from markdown using ChatGPT
-            current_app.logger.info("Starting ChatGPT trade extraction")
-            extraction_result = self.extract_trades_from_markdown(markdown_text)
+            # Step 2: Extract trades from each page's markdown using ChatGPT
+            page_markdowns = ocr_result.get("page_markdowns") or [markdown_text]
+            current_app.logger.info(f"Starting ChatGPT trade extraction for {len(page_markdowns)} pages")
 
-            all_trades = extraction_result.get("trades", [])
-            if "notes" in extraction_result:
-                all_notes.append(extraction_result["notes"])
+            all_trades = []
+            page_results = self._extract_trades_from_pages(page_markdowns)
+            failures = [result for _, result in page_results if isinstance(result, Exception)]
+            if failures and len(failures) == len(page_results):
+                # Nothing was extracted; surface the first failure as before
+                raise failures[0]
+
+            for page_number, result in page_results:
+                if isinstance(result, Exception):
+                    errors.append(f"Page {page_number}: {result}")
+                    continue
+                all_trades.extend(result.get("trades", []))
+                if "notes" in result:
+                    all_notes.append(result["notes"])
 
             current_app.logger.info(f"Extracted {len(all_trades)} raw trades")
 
@@ -254,6 +571,85 @@ Example output:
                 "errors": errors
             }
 
+    def _split_markdown(self, markdown_text: str) -> List[str]:
+        """
+        Split page markdown into chunks of at most MAX_CHUNK_CHARS.
+
+        Splits only on line boundaries so table rows stay intact; a single
+        line longer than the limit becomes its own chunk.
+
+        Args:
+            markdown_text: Markdown for one page
+
+        Returns:
+            List of chunks (just [markdown_text] when it already fits)
+        """
+        if len(markdown_text) <= self.MAX_CHUNK_CHARS:
+            return [markdown_text]
+
+        chunks = []
+        current = []
+        current_len = 0
+        for line in markdown_text.splitlines(keepends=True):
+            if current and current_len + len(line) > self.MAX_CHUNK_CHARS:
+                chunks.append("".join(current))
+                current = []
+                current_len = 0
+            current.append(line)
+            current_len += len(line)
+        if current:
+            chunks.append("".join(current))
+        return chunks
+
+    def _extract_trades_from_pages(self, page_markdowns: List[str]) -> List:
+        """
+        Run ChatGPT extraction for each page concurrently.
+
+        Each call spends nearly all its time waiting on the OpenAI API, so
+        pages are dispatched from a bounded thread pool and finish in roughly
+        the time of the slowest page rather than the sum of all pages.
+        Oversized pages are split into several calls (see _split_markdown).
+
+        Args:
+            page_markdowns: OCR-extracted markdown for each page
+
+        Returns:
+            List of (page number, result) tuples in page order, where result
+            is the extraction result dict or the exception raised while
+            extracting that page (or one chunk of it)
+        """
+        chunks = [
+            (page_number, chunk)
+            for page_number, markdown_text in enumerate(page_markdowns, start=1)
+            for chunk in self._split_markdown(markdown_text)
+        ]
+
+        def extract(markdown_text):
+            if not markdown_text.strip():
+                # Blank page (cover, separator); nothing to send
+                return {"trades": []}
+            try:
+                return self.extract_trades_from_markdown(markdown_text)
+            except Exception as e:
+                return e
+
+        if len(chunks) == 1:
+            page_number, markdown_text = chunks[0]
+            return [(page_number, extract(markdown_text))]
+
+        # Create the shared client up front; worker threads need their own app context
+        self._get_openai_client()
+        app = current_app._get_current_object()
+
+        def extract_chunk(chunk):
+            page_number, markdown_text = chunk
+            with app.app_context():
+                return page_number, extract(markdown_text)
+
+        max_workers = min(self.MAX_CONCURRENT_EXTRACTIONS, len(chunks))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(extract_chunk, chunks))
+
     def _deduplicate_trades(self, trades: List[Dict]) -> List[Dict]:
         """
         Remove duplicate trades based on (ticker, date, quantity).
@@ -264,22 +660,20 @@ Example output:
         Returns:
             Deduplicated list of trades
         """
-        seen = set()
-        unique_trades = []
+        # Keyed by (ticker, date, quantity); the first occurrence wins and
+        # dicts preserve insertion order
+        unique_trades = {}
 
         for trade in trades:
-            # Create unique key from ticker, date, and quantity
-            ticker = trade.get("ticker", "").upper()
-            date = trade.get("purchase_date", "")
-            quantity = trade.get("quantity", 0)
-
-            key = (ticker, date, quantity)
-
-            if key not in seen and ticker and date and quantity:
-                seen.add(key)
-                unique_trades.append(trade)
+            key = (
+                trade.get("ticker", "").upper(),
+                trade.get("purchase_date", ""),
+                trade.get("quantity", 0),
+            )
+            if key not in unique_trades and key[0] and key[1] and key[2]:
+                unique_trades[key] = trade
 
-        return unique_trades
+        return list(unique_trades.values())
 
     def _validate_trades(self, trades: List[Dict]) -> List[Dict]:
         """
@@ -352,25 +746,41 @@ Example output:
         """
         if not date_str:
             return None
+        date_str = date_str.strip()
 
-        # Common date formats to try
-        formats = [
-            "%Y-%m-%d",           # 2024-01-15
-            "%m/%d/%Y",           # 01/15/2024
-            "%m-%d-%Y",           # 01-15-2024
-            "%d/%m/%Y",           # 15/01/2024
-            "%d-%m-%Y",           # 15-01-2024
-            "%Y/%m/%d",           # 2024/01/15
-            "%B %d, %Y",          # January 15, 2024
-            "%b %d, %Y",          # Jan 15, 2024
-            "%d %B %Y",           # 15 January 2024
-            "%d %b %Y",           # 15 Jan 2024
-            "%Y%m%d",             # 20240115
-        ]
+        # Fast path: numeric layouts matched with precompiled regexes
+        for pattern, order in _NUMERIC_DATE_PATTERNS:
+            match = pattern.fullmatch(date_str)
+            if not match:
+                continue
+            for year_group, month_group, day_group in order:
+                try:
+                    return date(
+                        int(match.group(year_group)),
+                        int(match.group(month_group)),
+                        int(match.group(day_group)),
+                    ).isoformat()
+                except ValueError:
+                    continue
+            # Same layouts as the strptime formats, so no other format can match
+            return None
+
+        for pattern, (year_group, month_group, day_group) in _NAMED_MONTH_DATE_PATTERNS:
+            match = pattern.fullmatch(date_str)
+            if not match:
+                continue
+            month = _MONTHS.get(match.group(month_group).lower())
+            if month is None:
+                return None
+            try:
+                return date(int(match.group(year_group)), month, int(match.group(day_group))).isoformat()
+            except ValueError:
+                return None
 
-        for fmt in formats:
+        # Less common layouts (unpadded compact dates)
+        for fmt in _FALLBACK_DATE_FORMATS:
             try:
-                dt = datetime.strptime(date_str.strip(), fmt)
+                dt = datetime.strptime(date_str, fmt)
                 return dt.strftime("%Y-%m-%d")
             except ValueError:
                 continue
@@ -4,12 +4,80 @@ from datetime import datetime
 from app import db
 from app.models import Purchase, Sale, PurchaseSaleAssignment
 
+# Tolerance for floating point share comparisons
+TOLERANCE = 0.0001
+
 
 class InsufficientSharesError(ValueError):
     """Raised when attempting to sell more shares than available."""
     pass
 
 
+def _shares_available(user_id, ticker):
+    """
+    Count purchase lots and total shares remaining for a ticker in SQL.
+
+    Aggregates shares bought and shares already assigned to sales without
+    loading Purchase rows or their sale assignments.
+
+    Args:
+        user_id (int): User ID who owns the purchases
+        ticker (str): Stock ticker symbol
+
+    Returns:
+        tuple: (number of purchases, total shares remaining)
+    """
+    lot_count, shares_bought = (db.session.query(
+                                    db.func.count(Purchase.id),
+                                    db.func.coalesce(db.func.sum(Purchase.shares_bought), 0.0))
+                                .filter(Purchase.user_id == user_id, Purchase.ticker == ticker)
+                                .one())
+
+    shares_assigned = (db.session.query(
+                           db.func.coalesce(db.func.sum(PurchaseSaleAssignment.shares_assigned), 0.0))
+                       .join(Purchase, PurchaseSaleAssignment.purchase_id == Purchase.id)
+                       .filter(Purchase.user_id == user_id, Purchase.ticker == ticker)
+                       .scalar())
+
+    return lot_count, shares_bought - shares_assigned
+
+
+def _open_lots(user_id, ticker):
+    """
+    Load purchases that still have shares remaining, oldest first (FIFO).
+
+    Shares remaining are computed in SQL from each lot's sale assignments, so
+    fully sold lots (TOLERANCE or fewer shares left) are filtered out by the
+    database. Only the columns the FIFO loop needs are selected, as plain
+    rows rather than Purchase objects.
+
+    Args:
+        user_id (int): User ID who owns the purchases
+        ticker (str): Stock ticker symbol
+
+    Returns:
+        list: Rows with id, purchase_date, price_at_purchase and
+            shares_remaining, ordered by purchase_date
+    """
+    # Correlated per purchase, so only this user's lots for the ticker are
+    # summed (via the purchase_id index), not the whole assignments table
+    shares_assigned = (db.select(db.func.coalesce(db.func.sum(PurchaseSaleAssignment.shares_assigned), 0.0))
+                       .where(PurchaseSaleAssignment.purchase_id == Purchase.id)
+                       .scalar_subquery())
+    shares_remaining = Purchase.shares_bought - shares_assigned
+
+    return (db.session.query(
+                Purchase.id,
+                Purchase.purchase_date,
+                Purchase.price_at_purchase,
+                shares_remaining.label('shares_remaining'))
+            .filter(Purchase.user_id == user_id,
+                    Purchase.ticker == ticker,
+                    shares_remaining > TOLERANCE)
+            .order_by(Purchase.purchase_date.asc())
+            .all())
+
+
 def create_sale_with_fifo(user_id, ticker, sale_date, shares_sold, price_at_sale):
     """
     Create a sale record and assign shares using FIFO (First In, First Out) method.
@@ -38,26 +106,21 @@ def create_sale_with_fifo(user_id, ticker, sale_date, shares_sold, price_at_sale
     if isinstance(sale_date, datetime):
         sale_date = sale_date.date()
 
-    # Get all purchases for this ticker ordered by purchase_date (FIFO)
-    purchases = (Purchase.query
-                .filter_by(user_id=user_id, ticker=ticker)
-                .order_by(Purchase.purchase_date.asc())
-                .all())
+    # Check availability with SQL aggregates before loading any rows
+    lot_count, total_available = _shares_available(user_id, ticker)
 
-    if not purchases:
+    if not lot_count:
         raise InsufficientSharesError(f"No purchases found for ticker {ticker}")
 
-    # Calculate total shares available
-    total_available = sum(p.shares_remaining for p in purchases)
-
-    # Use tolerance for floating point comparison
-    TOLERANCE = 0.0001
     if total_available < shares_sold - TOLERANCE:
         raise InsufficientSharesError(
             f"Insufficient shares available. Available: {total_available:.4f}, "
             f"Requested: {shares_sold:.4f}"
         )
 
+    # Get purchases with shares left for this ticker ordered by purchase_date (FIFO)
+    lots = _open_lots(user_id, ticker)
+
     # Create the sale record
     total_proceeds = shares_sold * price_at_sale
     sale = Sale(
@@ -73,34 +136,29 @@ def create_sale_with_fifo(user_id, ticker, sale_date, shares_sold, price_at_sale
 
     # FIFO assignment loop
     remaining_to_sell = shares_sold
+    assignment_rows = []
 
-    for purchase in purchases:
+    for lot in lots:
         if remaining_to_sell <= TOLERANCE:
             break
 
-        available_from_purchase = purchase.shares_remaining
-
-        if available_from_purchase <= TOLERANCE:
-            continue
-
         # Determine how many shares to assign from this purchase
-        shares_to_assign = min(remaining_to_sell, available_from_purchase)
+        shares_to_assign = min(remaining_to_sell, lot.shares_remaining)
 
         # Calculate cost basis and proceeds for this assignment
-        cost_basis = shares_to_assign * purchase.price_at_purchase
+        cost_basis = shares_to_assign * lot.price_at_purchase
         proceeds = shares_to_assign * price_at_sale
         realized_gain_loss = proceeds - cost_basis
 
-        # Create assignment record
-        assignment = PurchaseSaleAssignment(
-            purchase_id=purchase.id,
-            sale_id=sale.id,
-            shares_assigned=shares_to_assign,
-            cost_basis=cost_basis,
-            proceeds=proceeds,
-            realized_gain_loss=realized_gain_loss
-        )
-        db.session.add(assignment)
+        # Collect assignment row (inserted in bulk after the loop)
+        assignment_rows.append({
+            'purchase_id': lot.id,
+            'sale_id': sale.id,
+            'shares_assigned': shares_to_assign,
+            'cost_basis': cost_basis,
+            'proceeds': proceeds,
+            'realized_gain_loss': realized_gain_loss
+        })
 
         remaining_to_sell -= shares_to_assign
 
@@ -111,7 +169,8 @@ def create_sale_with_fifo(user_id, ticker, sale_date, shares_sold, price_at_sale
             f"Failed to assign all shares. Remaining: {remaining_to_sell:.4f}"
         )
 
-    # Commit the transaction
+    # Insert all assignments in one batch and commit the transaction
+    db.session.bulk_insert_mappings(PurchaseSaleAssignment, assignment_rows)
     db.session.commit()
 
     return sale
@@ -181,13 +240,9 @@ def preview_fifo_assignment(user_id, ticker, shares_to_sell):
     if shares_to_sell <= 0:
         raise ValueError("shares_to_sell must be positive")
 
-    # Get all purchases for this ticker ordered by purchase_date (FIFO)
-    purchases = (Purchase.query
-                .filter_by(user_id=user_id, ticker=ticker)
-                .order_by(Purchase.purchase_date.asc())
-                .all())
+    lot_count, total_available = _shares_available(user_id, ticker)
 
-    if not purchases:
+    if not lot_count:
         return {
             'assignments': [],
             'total_cost_basis': 0.0,
@@ -196,38 +251,32 @@ def preview_fifo_assignment(user_id, ticker, shares_to_sell):
             'error': f'No purchases found for ticker {ticker}'
         }
 
-    # Calculate total shares available
-    total_available = sum(p.shares_remaining for p in purchases)
-
-    TOLERANCE = 0.0001
     is_sufficient = total_available >= shares_to_sell - TOLERANCE
 
+    # Get purchases with shares left for this ticker ordered by purchase_date (FIFO)
+    lots = _open_lots(user_id, ticker)
+
     # Preview FIFO assignment
     assignments = []
     remaining_to_sell = shares_to_sell
     total_cost_basis = 0.0
 
-    for purchase in purchases:
+    for lot in lots:
         if remaining_to_sell <= TOLERANCE:
             break
 
-        available_from_purchase = purchase.shares_remaining
-
-        if available_from_purchase <= TOLERANCE:
-            continue
-
         # Determine how many shares would be assigned from this purchase
-        shares_to_assign = min(remaining_to_sell, available_from_purchase)
+        shares_to_assign = min(remaining_to_sell, lot.shares_remaining)
 
         # Calculate cost basis for this assignment
-        cost_basis = shares_to_assign * purchase.price_at_purchase
+        cost_basis = shares_to_assign * lot.price_at_purchase
         total_cost_basis += cost_basis
 
         assignments.append({
-            'purchase_id': purchase.id,
-            'purchase_date': purchase.purchase_date.isoformat(),
-            'price_at_purchase': purchase.price_at_purchase,
-            'shares_available': available_from_purchase,
+            'purchase_id': lot.id,
+            'purchase_date': lot.purchase_date.isoformat(),
+            'price_at_purchase': lot.price_at_purchase,
+            'shares_available': lot.shares_remaining,
             'shares_to_assign': shares_to_assign,
             'cost_basis': cost_basis
         })
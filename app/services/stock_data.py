@@ -1,19 +1,56 @@
 import yfinance as yf
 import math
 import calendar
+import time
 from datetime import datetime, timedelta, date
+from concurrent.futures import ThreadPoolExecutor
+from flask import g, after_this_request, current_app
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.exc import IntegrityError
 from app import db
 from app.models import PriceCache
 
-# Module-level cache for current prices
-_price_cache = {}  # {ticker: price}
+# Module-level cache for current prices, each entry expiring after
+# PRICE_CACHE_TTL seconds so long-running workers don't serve stale quotes
+_price_cache = {}  # {ticker: (price, expires_at on the time.monotonic() clock)}
+PRICE_CACHE_TTL = 60.0
+
+# SPY trading days per year: {year: (set of dates, date fetched)}
+_trading_days_cache = {}
+
+# Single-day checks for today or later: {date: (is trading day, expires_at on
+# the time.monotonic() clock)}
+_recent_trading_day_cache = {}
+TRADING_DAY_CHECK_TTL = 300.0
+
+# Upper bound on concurrent per-ticker history fetches in get_price_histories
+PRICE_HISTORY_MAX_WORKERS = 8
+
+def _cache_current_price(ticker: str, price: float):
+    """Store a current price in the in-memory cache with a fresh TTL."""
+    _price_cache[ticker] = (price, time.monotonic() + PRICE_CACHE_TTL)
 
 def invalidate_price_cache():
     """Clear the in-memory price cache."""
     global _price_cache
     _price_cache.clear()
 
+def schedule_price_cache_invalidation():
+    """
+    Defer invalidate_price_cache() until the current response has been sent.
+
+    Keeps the purge off the request's critical path. Repeated calls within the
+    same request only schedule a single invalidation.
+    """
+    if g.get('price_cache_invalidation_scheduled'):
+        return
+    g.price_cache_invalidation_scheduled = True
+
+    @after_this_request
+    def _invalidate_after_response(response):
+        response.call_on_close(invalidate_price_cache)
+        return response
+
 def get_current_prices(tickers: list) -> dict:
     """
     Batch fetch current prices for multiple tickers.
@@ -31,29 +68,21 @@ def get_current_prices(tickers: list) -> dict:
         # Fetch all tickers at once using yfinance download
         data = yf.download(tickers, period='1d', progress=False, group_by='ticker')
 
-        prices = {}
+        if data.empty:
+            return {}
 
-        # Handle single ticker vs multiple tickers
-        if len(tickers) == 1:
-            ticker = tickers[0]
-            if not data.empty and 'Close' in data.columns:
-                price = float(data['Close'].iloc[-1])
-                if not math.isnan(price):
-                    prices[ticker] = price
-                    _price_cache[ticker] = price
+        # Take the last row's Close for every ticker at once. Columns are
+        # (ticker, field) when grouped by ticker; a flat frame is one ticker
+        if data.columns.nlevels > 1:
+            closes = data.xs('Close', axis=1, level=1)
         else:
-            # Multiple tickers - data is grouped by ticker
-            for ticker in tickers:
-                try:
-                    if ticker in data.columns.get_level_values(0):
-                        ticker_data = data[ticker]
-                        if not ticker_data.empty and 'Close' in ticker_data.columns:
-                            price = float(ticker_data['Close'].iloc[-1])
-                            if not math.isnan(price):
-                                prices[ticker] = price
-                                _price_cache[ticker] = price
-                except Exception as e:
-                    print(f"Error extracting price for {ticker}: {e}")
+            closes = data[['Close']].set_axis([tickers[0]], axis=1)
+        last_closes = closes.iloc[-1].astype(float).dropna()
+
+        prices = {ticker: price for ticker, price in zip(last_closes.index, last_closes.tolist())
+                  if ticker in tickers}
+        for ticker, price in prices.items():
+            _cache_current_price(ticker, price)
 
         return prices
 
@@ -61,12 +90,29 @@ def get_current_prices(tickers: list) -> dict:
         print(f"Error batch fetching prices: {e}")
         return {}
 
-def validate_ticker(ticker: str) -> bool:
-    """Check if a ticker symbol is valid (works for stocks and ETFs)."""
+def _is_comparison_ticker(ticker_upper: str) -> bool:
+    """
+    Check whether a ticker is one of the comparison stocks.
+
+    Positive answers are remembered on the app (comparison stocks are never
+    removed); misses always query, so a stock added later is still found.
+    """
     from app.models import ComparisonStock
 
+    known = current_app.extensions.setdefault('comparison_tickers', set())
+    if ticker_upper in known:
+        return True
+
+    if db.session.query(ComparisonStock.ticker).filter_by(ticker=ticker_upper).first() is None:
+        return False
+
+    known.add(ticker_upper)
+    return True
+
+def validate_ticker(ticker: str) -> bool:
+    """Check if a ticker symbol is valid (works for stocks and ETFs)."""
     # Fast path: comparison stocks are always valid
-    if ComparisonStock.query.filter_by(ticker=ticker.upper()).first():
+    if _is_comparison_ticker(ticker.upper()):
         return True
 
     # Full validation using download (works for stocks AND ETFs)
@@ -76,22 +122,85 @@ def validate_ticker(ticker: str) -> bool:
     except Exception:
         return False
 
+def _get_trading_days(year: int, as_of: date) -> set:
+    """
+    Return the set of dates SPY traded in a year, fetched once per year.
+
+    A cached year is reused for any date before the day it was fetched (those
+    sessions are final); a past date on or after that day triggers a refetch.
+    An empty result (e.g. a transient yfinance failure) is never cached.
+    """
+    cached = _trading_days_cache.get(year)
+    if cached and as_of < cached[1]:
+        return cached[0]
+
+    # We use SPY as a proxy since it's always traded on market days
+    stock = yf.Ticker('SPY')
+    hist = stock.history(start=date(year, 1, 1), end=date(year + 1, 1, 1))
+    trading_days = {idx.date() for idx in hist.index}
+    if trading_days:
+        _trading_days_cache[year] = (trading_days, datetime.now().date())
+    return trading_days
+
+def _is_recent_trading_day(day: date) -> bool:
+    """
+    Check today (or a later date) with a single-day SPY lookup.
+
+    Today's session may not have started yet, so the answer is only cached
+    for TRADING_DAY_CHECK_TTL seconds rather than refetching the whole year.
+    """
+    cached = _recent_trading_day_cache.get(day)
+    if cached and cached[1] > time.monotonic():
+        return cached[0]
+
+    stock = yf.Ticker('SPY')
+    hist = stock.history(start=day, end=day + timedelta(days=1))
+    result = len(hist) > 0
+    _recent_trading_day_cache[day] = (result, time.monotonic() + TRADING_DAY_CHECK_TTL)
+    return result
+
 def is_trading_day(date) -> bool:
     """Check if a date is a valid trading day (not weekend)."""
     # Basic check: weekday (0=Monday, 6=Sunday)
     if date.weekday() >= 5:
         return False
 
-    # Try to get price for that date - if no data, it's likely a holiday
-    # We use SPY as a proxy since it's always traded on market days
+    # Check SPY's trading days for that year - if no data, it's likely a holiday.
+    # Past years are fetched in one request and cached, so repeated checks
+    # (e.g. walking back to the last trading day of each month) are set lookups
     try:
-        stock = yf.Ticker('SPY')
-        end_date = date + timedelta(days=1)
-        hist = stock.history(start=date, end=end_date)
-        return len(hist) > 0
+        if date < datetime.now().date():
+            return date in _get_trading_days(date.year, date)
+        return _is_recent_trading_day(date)
     except Exception:
         return False
 
+def _insert_price_cache_entries(entries: list):
+    """
+    Insert PriceCache rows, skipping (ticker, date) pairs that already exist.
+
+    Uses INSERT ... ON CONFLICT DO NOTHING on PostgreSQL and SQLite, so
+    concurrent requests caching the same prices don't fail each other's
+    batch; other databases fall back to a bulk insert that is discarded on
+    conflict (the caller already has the prices it needs).
+    """
+    dialect_insert = {
+        'postgresql': postgresql.insert,
+        'sqlite': sqlite.insert,
+    }.get(db.engine.dialect.name)
+
+    try:
+        if dialect_insert is not None:
+            stmt = dialect_insert(PriceCache).on_conflict_do_nothing(
+                index_elements=['ticker', 'date'])
+            db.session.execute(stmt, entries)
+        else:
+            db.session.bulk_insert_mappings(PriceCache, entries)
+        db.session.commit()
+    except IntegrityError:
+        # Another request already cached some/all prices - rollback and continue
+        db.session.rollback()
+
 def get_price_on_date(ticker: str, date) -> float:
     """Get the closing price for a ticker on a specific date. Uses cache."""
     # Check cache first
@@ -111,15 +220,10 @@ def get_price_on_date(ticker: str, date) -> float:
         if math.isnan(close_price):
             return None
 
-        # Cache the price - handle race condition where another request may have
-        # cached the same price concurrently
-        try:
-            cache_entry = PriceCache(ticker=ticker, date=date, close_price=close_price)
-            db.session.add(cache_entry)
-            db.session.commit()
-        except IntegrityError:
-            # Another request already cached this price - rollback and continue
-            db.session.rollback()
+        # Cache the price (no-op if another request cached it concurrently)
+        _insert_price_cache_entries([
+            {'ticker': ticker, 'date': date, 'close_price': close_price}
+        ])
 
         return close_price
     except Exception as e:
@@ -127,24 +231,60 @@ def get_price_on_date(ticker: str, date) -> float:
         db.session.rollback()
         return None
 
+def get_prices_on_date(tickers: list, date) -> dict:
+    """
+    Get closing prices for several tickers on one date.
+
+    Cached prices are read in a single query; only tickers missing from the
+    cache fall back to get_price_on_date (and yfinance).
+
+    Returns:
+        Dict of {ticker: price}; tickers with no price on that date are omitted
+    """
+    unique_tickers = list(dict.fromkeys(tickers))
+    if not unique_tickers:
+        return {}
+
+    rows = db.session.query(PriceCache.ticker, PriceCache.close_price).filter(
+        PriceCache.ticker.in_(unique_tickers),
+        PriceCache.date == date
+    ).all()
+    prices = {ticker: close_price for ticker, close_price in rows}
+
+    for ticker in unique_tickers:
+        if ticker not in prices:
+            price = get_price_on_date(ticker, date)
+            if price is not None:
+                prices[ticker] = price
+
+    return prices
+
 def get_current_price(ticker: str) -> float:
     """
     Get the current/latest price for a ticker.
-    Uses in-memory cache if available, otherwise fetches from yfinance.
+    Uses in-memory cache if available and not expired, otherwise fetches from yfinance.
     """
     # Check cache first
-    if ticker in _price_cache:
-        return _price_cache[ticker]
+    cached = _price_cache.get(ticker)
+    if cached and cached[1] > time.monotonic():
+        return cached[0]
 
-    # Not cached - fetch single ticker
+    # Not cached - fetch single ticker. fast_info reads the price from the
+    # lightweight chart endpoint instead of the full quoteSummary payload
+    # behind .info; yfinance reuses one pooled HTTP session across calls
     try:
         stock = yf.Ticker(ticker)
-        info = stock.info
-        price = info.get('regularMarketPrice') or info.get('previousClose')
+        info = stock.fast_info
+        price = info.last_price or info.previous_close
+
+        if price is not None:
+            price = float(price)
+            if math.isnan(price):
+                price = None
 
         # Cache the result
         if price is not None:
-            _price_cache[ticker] = price
+            _cache_current_price(ticker, price)
 
         return price
     except Exception as e:
@@ -184,17 +324,14 @@ def get_price_history(ticker: str, start_date, end_date=None) -> dict:
             hist = stock.history(start=start_date, end=end_date + timedelta(days=1))
 
             if not hist.empty:
+                # Drop NaN closes and convert the column in one pass instead
+                # of building a Series per row with iterrows()
+                closes = hist['Close'].astype(float).dropna()
+
                 # Prepare bulk insert data
                 new_cache_entries = []
 
-                for idx, row in hist.iterrows():
-                    date = idx.date()
-                    close_price = float(row['Close'])
-
-                    # Skip NaN values
-                    if math.isnan(close_price):
-                        continue
-
+                for date, close_price in zip(closes.index.date, closes.tolist()):
                     # Only add if not already cached
                     if date not in cached_dates:
                         prices[date] = close_price
@@ -206,16 +343,10 @@ def get_price_history(ticker: str, start_date, end_date=None) -> dict:
                             'close_price': close_price
                         })
 
-                # Bulk insert new cache entries - handle race condition where another
-                # request may have cached the same prices concurrently
+                # Bulk insert new cache entries; rows another request cached
+                # concurrently are skipped rather than failing the whole batch
                 if new_cache_entries:
-                    try:
-                        db.session.bulk_insert_mappings(PriceCache, new_cache_entries)
-                        db.session.commit()
-                    except IntegrityError:
-                        # Another request already cached some/all prices - rollback and continue
-                        # The prices dict already has the values we need
-                        db.session.rollback()
+                    _insert_price_cache_entries(new_cache_entries)
 
         return prices
 
@@ -224,6 +355,32 @@ def get_price_history(ticker: str, start_date, end_date=None) -> dict:
         db.session.rollback()
         return {}
 
+def get_price_histories(tickers: list, start_date, end_date=None) -> dict:
+    """
+    Get price history for several tickers concurrently.
+
+    Each get_price_history call is dominated by waiting on yfinance, so
+    tickers are fetched from a bounded thread pool and the total time is
+    roughly that of the slowest ticker rather than the sum.
+
+    Returns:
+        Dict of {ticker: {date: close_price}} (duplicate tickers fetched once)
+    """
+    unique_tickers = list(dict.fromkeys(tickers))
+    if len(unique_tickers) <= 1:
+        return {ticker: get_price_history(ticker, start_date, end_date) for ticker in unique_tickers}
+
+    # Worker threads need their own app context (and so their own db session)
+    app = current_app._get_current_object()
+
+    def fetch(ticker):
+        with app.app_context():
+            return get_price_history(ticker, start_date, end_date)
+
+    max_workers = min(PRICE_HISTORY_MAX_WORKERS, len(unique_tickers))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(zip(unique_tickers, executor.map(fetch, unique_tickers)))
+
 def get_last_trading_day_of_month(year: int, month: int) -> date:
     """
     Find the last trading day of a given month.
@@ -227,9 +227,15 @@ def example_scenario():
             print(f"{'Date':<12} {'Shares Bought':<15} {'Shares Remaining':<18}")
             print("-" * 50)
 
+            # Reload once to get updated shares_remaining (assignments are
+            # selectin-loaded for all purchases in one extra query)
+            db.session.expire_all()
+            purchases = Purchase.query.filter_by(
+                user_id=user.id,
+                ticker='AAPL'
+            ).order_by(Purchase.purchase_date).all()
+
             for p in purchases:
-                # Refresh to get updated shares_remaining
-                db.session.refresh(p)
                 print(f"{p.purchase_date.isoformat():<12} "
                       f"{p.shares_bought:<15.2f} "
                       f"{p.shares_remaining:<18.2f}")
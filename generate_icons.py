@@ -1,13 +1,17 @@
 #!/usr/bin/env python3
 """Generate PNG icons and favicon from SVG source."""
 
+import hashlib
 import os
 import sys
 
+from icon_stamps import is_current, read_stamps, write_stamps
+
 try:
     import cairosvg
+    import cairosvg.parser
+    import cairosvg.surface
     from PIL import Image
-    import io
 except ImportError as e:
     print(f"Error: Missing required package - {e}")
     print("Installing required packages...")
@@ -16,58 +20,78 @@ except ImportError as e:
     print("Packages installed. Please run the script again.")
     sys.exit(1)
 
-def generate_png_icons():
-    """Generate PNG icons from SVG source."""
-    svg_path = 'app/static/icons/icon.svg'
+SVG_PATH = 'app/static/icons/icon.svg'
+
+_svg_tree = None
+
+def load_svg_tree():
+    """Read and parse the SVG source once; every icon size renders from the same tree."""
+    global _svg_tree
+    if _svg_tree is None:
+        with open(SVG_PATH, 'rb') as f:
+            svg_bytes = f.read()
+        _svg_tree = cairosvg.parser.Tree(bytestring=svg_bytes, url=SVG_PATH)
+    return _svg_tree
+
+def render_image(size):
+    """Render the parsed SVG at size x size straight into a Pillow RGBA image."""
+    # No output target: draw into cairo's pixel buffer and hand that to
+    # Pillow, skipping a PNG encode/decode round-trip
+    surface = cairosvg.surface.PNGSurface(
+        load_svg_tree(), None, 96,
+        output_width=size,
+        output_height=size
+    )
+    surface.cairo.flush()
+    # Cairo ARGB32 is premultiplied, native-endian (BGRA byte order on little-endian)
+    image = Image.frombuffer(
+        'RGBA', (surface.width, surface.height), bytes(surface.cairo.get_data()),
+        'raw', 'BGRa', surface.cairo.get_stride(), 1
+    )
+    surface.finish()
+    return image
 
-    if not os.path.exists(svg_path):
-        print(f"Error: {svg_path} not found!")
+def generate_png_icons(digest, stamps):
+    """Generate PNG icons from SVG source, skipping any already current."""
+    if not os.path.exists(SVG_PATH):
+        print(f"Error: {SVG_PATH} not found!")
         return False
 
-    print(f"Reading SVG from: {svg_path}")
-
-    # Generate 192x192 icon
-    print("Generating 192x192 icon...")
-    cairosvg.svg2png(
-        url=svg_path,
-        write_to='app/static/icons/icon-192.png',
-        output_width=192,
-        output_height=192
-    )
-    print("✓ Created app/static/icons/icon-192.png")
-
-    # Generate 512x512 icon
-    print("Generating 512x512 icon...")
-    cairosvg.svg2png(
-        url=svg_path,
-        write_to='app/static/icons/icon-512.png',
-        output_width=512,
-        output_height=512
-    )
-    print("✓ Created app/static/icons/icon-512.png")
+    print(f"Reading SVG from: {SVG_PATH}")
+
+    # Generate 192x192 and 512x512 icons
+    for size in (192, 512):
+        icon_path = f'app/static/icons/icon-{size}.png'
+        if is_current(icon_path, digest, stamps):
+            print(f"✓ {icon_path} is up to date")
+            continue
+        print(f"Generating {size}x{size} icon...")
+        # Encode through Pillow: cairo writes unoptimized PNGs
+        icon = render_image(size)
+        icon.save(icon_path, 'PNG', optimize=True)
+        stamps[icon_path] = digest
+        print(f"✓ Created {icon_path}")
 
     return True
 
-def generate_favicon():
-    """Generate favicon.ico with multiple sizes."""
-    svg_path = 'app/static/icons/icon.svg'
+def generate_favicon(digest, stamps):
+    """Generate favicon.ico with multiple sizes, unless already current."""
     favicon_path = 'app/static/favicon.ico'
+    if is_current(favicon_path, digest, stamps):
+        print(f"✓ {favicon_path} is up to date")
+        return True
 
     print("Generating favicon.ico...")
 
-    # Generate different sizes
+    # Rasterize the SVG once at 96x96 and downscale for each layer; a
+    # Lanczos resample is far cheaper than another SVG render
     sizes = [16, 32, 48]
+    master = render_image(96)
     images = []
 
     for size in sizes:
         print(f"  - Creating {size}x{size} favicon layer...")
-        png_data = cairosvg.svg2png(
-            url=svg_path,
-            output_width=size,
-            output_height=size
-        )
-        img = Image.open(io.BytesIO(png_data))
-        images.append(img)
+        images.append(master.resize((size, size), Image.LANCZOS))
 
     # Save as ICO with multiple sizes
     images[0].save(
@@ -76,21 +100,32 @@ def generate_favicon():
         sizes=[(img.width, img.height) for img in images],
         append_images=images[1:]
     )
+    stamps[favicon_path] = digest
 
     print(f"✓ Created {favicon_path}")
     return True
 
+OUTPUT_FILES = [
+    'app/static/icons/icon-192.png',
+    'app/static/icons/icon-512.png',
+    'app/static/favicon.ico'
+]
+
+def source_hash():
+    """Hash the SVG source and this script, so editing either triggers a rebuild."""
+    digest = hashlib.sha256()
+    for path in (SVG_PATH, __file__):
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
 def verify_files():
     """Verify that all generated files exist."""
-    files = [
-        'app/static/icons/icon-192.png',
-        'app/static/icons/icon-512.png',
-        'app/static/favicon.ico'
-    ]
-
     print("\nVerifying generated files...")
     all_exist = True
-    for file_path in files:
+    for file_path in OUTPUT_FILES:
         if os.path.exists(file_path):
             size = os.path.getsize(file_path)
             print(f"✓ {file_path} ({size} bytes)")
@@ -105,13 +140,20 @@ def main():
     print("Icon Generator for Honest Portfolio")
     print("=" * 50)
 
-    # Generate PNG icons
-    if not generate_png_icons():
+    # Skip regeneration when nothing has changed since the last run
+    digest = source_hash()
+    stamps = read_stamps()
+    if all(is_current(path, digest, stamps) for path in OUTPUT_FILES):
+        print("Icons are up to date (source unchanged), nothing to do.")
+        return 0
+
+    # Generate PNG icons (each output is rebuilt only if stale or missing)
+    if not generate_png_icons(digest, stamps):
         print("\nFailed to generate PNG icons!")
         return 1
 
     # Generate favicon
-    if not generate_favicon():
+    if not generate_favicon(digest, stamps):
         print("\nFailed to generate favicon!")
         return 1
 
@@ -120,6 +162,8 @@ def main():
         print("\nWarning: Some files were not created successfully!")
         return 1
 
+    write_stamps(stamps)
+
     print("\n" + "=" * 50)
     print("All icons generated successfully!")
     return 0
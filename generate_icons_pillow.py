@@ -1,8 +1,12 @@
 #!/usr/bin/env python3
 """Generate PNG icons and favicon from SVG - using Pillow approach."""
 
+import hashlib
 import os
 import sys
+from functools import lru_cache
+
+from icon_stamps import is_current, read_stamps, write_stamps
 
 try:
     from PIL import Image, ImageDraw, ImageFont
@@ -12,6 +16,24 @@ except ImportError:
     subprocess.check_call([sys.executable, "-m", "pip", "install", "Pillow"])
     from PIL import Image, ImageDraw, ImageFont
 
+# Bold fonts to try, in order (Helvetica, then Arial Bold)
+FONT_CANDIDATES = [
+    "/System/Library/Fonts/Helvetica.ttc",
+    "/System/Library/Fonts/Supplemental/Arial Bold.ttf",
+]
+FONT_PATH = next((path for path in FONT_CANDIDATES if os.path.exists(path)), None)
+
+@lru_cache(maxsize=None)
+def load_font(font_size):
+    """Load the icon font at a given size, parsing each size only once."""
+    if FONT_PATH:
+        try:
+            return ImageFont.truetype(FONT_PATH, font_size)
+        except OSError:
+            pass
+    # Fallback to default font
+    return ImageFont.load_default()
+
 def create_icon(size):
     """Create an icon with HP text matching the SVG design."""
     # Create a new image with blue background
@@ -22,16 +44,7 @@ def create_icon(size):
     # The SVG has font-size 280 for 512x512 image
     font_size = int(size * 280 / 512)
 
-    # Try to use a bold font
-    try:
-        # Try to find Arial Bold or similar
-        font = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", font_size)
-    except:
-        try:
-            font = ImageFont.truetype("/System/Library/Fonts/Supplemental/Arial Bold.ttf", font_size)
-        except:
-            # Fallback to default font with size
-            font = ImageFont.load_default()
+    font = load_font(font_size)
 
     # Draw "HP" text centered
     text = "HP"
@@ -58,13 +71,13 @@ def generate_png_icons():
     # Create 192x192 icon
     print("Creating 192x192 icon...")
     icon_192 = create_icon(192)
-    icon_192.save('app/static/icons/icon-192.png', 'PNG')
+    icon_192.save('app/static/icons/icon-192.png', 'PNG', optimize=True)
     print("✓ Created app/static/icons/icon-192.png")
 
     # Create 512x512 icon
     print("Creating 512x512 icon...")
     icon_512 = create_icon(512)
-    icon_512.save('app/static/icons/icon-512.png', 'PNG')
+    icon_512.save('app/static/icons/icon-512.png', 'PNG', optimize=True)
     print("✓ Created app/static/icons/icon-512.png")
 
     return True
@@ -73,14 +86,14 @@ def generate_favicon():
     """Generate favicon.ico with multiple sizes."""
     print("Generating favicon.ico...")
 
-    # Generate different sizes
+    # Draw the icon once at 96x96 and downscale for each layer
     sizes = [16, 32, 48]
+    master = create_icon(96)
     images = []
 
     for size in sizes:
         print(f"  - Creating {size}x{size} favicon layer...")
-        img = create_icon(size)
-        images.append(img)
+        images.append(master.resize((size, size), Image.LANCZOS))
 
     # Save as ICO with multiple sizes
     images[0].save(
@@ -93,17 +106,22 @@ def generate_favicon():
     print("✓ Created app/static/favicon.ico")
     return True
 
+OUTPUT_FILES = [
+    'app/static/icons/icon-192.png',
+    'app/static/icons/icon-512.png',
+    'app/static/favicon.ico'
+]
+
+def source_hash():
+    """Hash this script (the icon is drawn in code), so editing it triggers a rebuild."""
+    with open(__file__, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
 def verify_files():
     """Verify that all generated files exist."""
-    files = [
-        'app/static/icons/icon-192.png',
-        'app/static/icons/icon-512.png',
-        'app/static/favicon.ico'
-    ]
-
     print("\nVerifying generated files...")
     all_exist = True
-    for file_path in files:
+    for file_path in OUTPUT_FILES:
         if os.path.exists(file_path):
             size = os.path.getsize(file_path)
             print(f"✓ {file_path} ({size:,} bytes)")
@@ -118,6 +136,13 @@ def main():
     print("Icon Generator for Honest Portfolio")
     print("=" * 50)
 
+    # Skip regeneration when nothing has changed since the last run
+    digest = source_hash()
+    stamps = read_stamps()
+    if all(is_current(path, digest, stamps) for path in OUTPUT_FILES):
+        print("Icons are up to date (source unchanged), nothing to do.")
+        return 0
+
     # Check if output directories exist
     os.makedirs('app/static/icons', exist_ok=True)
 
@@ -136,6 +161,8 @@ def main():
         print("\nWarning: Some files were not created successfully!")
         return 1
 
+    write_stamps({path: digest for path in OUTPUT_FILES})
+
     print("\n" + "=" * 50)
     print("All icons generated successfully!")
     return 0
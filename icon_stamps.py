@@ -0,0 +1,32 @@
+"""Per-output source stamps shared by the icon generator scripts.
+
+The stamp file maps each generated file to the hash of the source it was
+built from. Both generators hash their own script into the digest, so an
+output written by one script is always stale for the other.
+"""
+
+import json
+import os
+
+# Records, per output file, the source hash it was generated from
+STAMP_PATH = 'app/static/icons/.icon_stamp'
+
+def read_stamps():
+    """Load the per-output source hashes from the last run (empty if none)."""
+    try:
+        with open(STAMP_PATH) as f:
+            stamps = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return stamps if isinstance(stamps, dict) else {}
+
+def write_stamps(stamps):
+    """Write the stamps atomically, so an interrupted run can't leave a partial file."""
+    tmp_path = f'{STAMP_PATH}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(stamps, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, STAMP_PATH)
+
+def is_current(path, digest, stamps):
+    """Check an output exists and was generated from the same source."""
+    return digest is not None and os.path.exists(path) and stamps.get(path) == digest
@@ -0,0 +1,28 @@
+"""Add composite index on purchases (user_id, ticker, purchase_date)
+
+Revision ID: 002
+Created: 2026-10-15
+
+Sale creation and FIFO previews aggregate and scan a user's purchases for one
+ticker in purchase_date order; this index serves both lookups.
+"""
+
+from alembic import op
+
+
+# Revision identifiers
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Apply the migration."""
+    op.create_index('ix_purchases_user_ticker_date', 'purchases',
+                    ['user_id', 'ticker', 'purchase_date'])
+
+
+def downgrade():
+    """Revert the migration."""
+    op.drop_index('ix_purchases_user_ticker_date', table_name='purchases')
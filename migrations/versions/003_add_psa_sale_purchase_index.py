@@ -0,0 +1,33 @@
+"""Replace purchase_sale_assignments sale_id index with a covering composite
+
+Revision ID: 003
+Created: 2026-10-15
+
+Assignments are looked up by sale and then walked by purchase; an index on
+(sale_id, purchase_id) serves both, and on Postgres it includes the assigned
+amounts so the lookup never has to visit the table.
+"""
+
+from alembic import op
+
+
+# Revision identifiers
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Apply the migration."""
+    op.create_index('ix_psa_sale_purchase', 'purchase_sale_assignments',
+                    ['sale_id', 'purchase_id'],
+                    postgresql_include=['shares_assigned', 'cost_basis',
+                                        'proceeds', 'realized_gain_loss'])
+    op.drop_index('ix_psa_sale_id', table_name='purchase_sale_assignments')
+
+
+def downgrade():
+    """Revert the migration."""
+    op.create_index('ix_psa_sale_id', 'purchase_sale_assignments', ['sale_id'])
+    op.drop_index('ix_psa_sale_purchase', table_name='purchase_sale_assignments')
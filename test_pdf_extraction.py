@@ -3,6 +3,7 @@
 Test script for PDF extraction using Mistral OCR + ChatGPT.
 """
 
+import io
 import sys
 import json
 from pathlib import Path
@@ -60,7 +61,8 @@ def test_extraction(pdf_path: str):
 
         print("\nStep 3: Running full pipeline (with validation)...")
         try:
-            result = extractor.extract_trades_from_pdf(pdf_bytes)
+            # Reuse the Step 1 OCR output rather than paying for OCR twice
+            result = extractor.extract_trades_from_pdf(pdf_bytes, ocr_result=ocr_result)
             print(f"✓ Full pipeline completed!")
             print(f"\n{'='*80}")
             print("RESULTS:")
@@ -72,12 +74,17 @@ def test_extraction(pdf_path: str):
             if result['trades']:
                 print(f"\nExtracted Trades:")
                 print("-" * 80)
+                # Build the report first and write it in one go
+                report = io.StringIO()
                 for i, trade in enumerate(result['trades'], 1):
-                    print(f"\n{i}. {trade['ticker']}")
-                    print(f"   Date: {trade['purchase_date']}")
-                    print(f"   Quantity: {trade['quantity']} shares")
-                    print(f"   Price: ${trade['price_per_share']:.2f}")
-                    print(f"   Total: ${trade['total_amount']:.2f}")
+                    report.write(
+                        f"\n{i}. {trade['ticker']}\n"
+                        f"   Date: {trade['purchase_date']}\n"
+                        f"   Quantity: {trade['quantity']} shares\n"
+                        f"   Price: ${trade['price_per_share']:.2f}\n"
+                        f"   Total: ${trade['total_amount']:.2f}\n"
+                    )
+                sys.stdout.write(report.getvalue())
             else:
                 print("\nNo trades were extracted.")
                 if result.get('notes'):
@@ -2,67 +2,156 @@
 Pytest configuration and fixtures for the Honest Portfolio test suite.
 """
 import pytest
-import tempfile
-import os
+import sqlite3
+from unittest.mock import patch
 from datetime import datetime, date
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
+from sqlalchemy.pool import QueuePool
 
 
 # Import without triggering execution
-from app import db
-
+from app import db, login_manager
+
+
+# Prices returned by the mock_stock_prices fixture
+MOCK_PURCHASE_PRICES = {
+    'META': 500.00,   # Purchase date price
+    'SPY': 450.00,
+    'AAPL': 180.00,
+    'GOOGL': 140.00,
+    'NVDA': 500.00,
+    'AMZN': 150.00,
+}
+
+MOCK_CURRENT_PRICES = {
+    'META': 550.00,   # 10% gain
+    'SPY': 495.00,    # 10% gain
+    'AAPL': 198.00,   # 10% gain
+    'GOOGL': 154.00,  # 10% gain
+    'NVDA': 600.00,   # 20% gain
+    'AMZN': 165.00,   # 10% gain
+}
+
+# Named shared-cache in-memory database: every connection to this URI sees the
+# same data, so worker threads can use their own pooled connections. Nothing
+# is written to disk, so there is no journal or fsync to tune with pragmas
+TEST_DATABASE_URI = 'file:/honest-portfolio-tests?mode=memory&cache=shared'
+
+# Default comparison stocks, seeded once per run
+COMPARISON_STOCKS = [
+    ('SPY', 'S&P 500 ETF'),
+    ('AAPL', 'Apple'),
+    ('META', 'Meta'),
+    ('GOOGL', 'Alphabet/Google'),
+    ('NVDA', 'Nvidia'),
+    ('AMZN', 'Amazon'),
+]
+
+
+@pytest.fixture(scope='session')
+def _session_app():
+    """
+    Build the test Flask application and its database schema once per run.
 
-@pytest.fixture(scope='function')
-def app(monkeypatch):
-    """Create and configure a test Flask application instance."""
+    The default comparison stocks are seeded here too. Tests get the app
+    through the function-scoped `app` fixture, which empties every other
+    table afterwards so each test still starts from a clean database.
+    """
     # Import models here to access them
     from app.models import ComparisonStock, Purchase, PriceCache
 
-    # Monkey-patch the seed function BEFORE importing create_app logic
-    # This prevents auto-seeding during create_app()
-    import app.models
-    monkeypatch.setattr(app.models, 'seed_comparison_stocks', lambda: None)
-
-    # Create a temporary database file
-    db_fd, db_path = tempfile.mkstemp()
-
-    # Now create the app - manually without calling create_app() to avoid seeding
-    test_app = Flask(__name__, static_folder='../app/static')
-    test_app.config.update({
-        'TESTING': True,
-        'SECRET_KEY': 'test-secret-key',
-        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}',
-        'SQLALCHEMY_TRACK_MODIFICATIONS': False,
-    })
-
-    # Initialize extensions
-    db.init_app(test_app)
-    CORS(test_app)
-
-    # Register blueprints
-    from app.routes.purchases import purchases_bp
-    from app.routes.portfolio import portfolio_bp
-    from app.routes.stocks import stocks_bp
-
-    test_app.register_blueprint(purchases_bp, url_prefix='/api')
-    test_app.register_blueprint(portfolio_bp, url_prefix='/api')
-    test_app.register_blueprint(stocks_bp, url_prefix='/api')
-
-    # Create the database and tables (without seeding)
-    with test_app.app_context():
-        db.create_all()
-
-    yield test_app
+    # SQLite drops a shared in-memory database when its last connection closes,
+    # so hold one open for the whole run
+    keep_alive = sqlite3.connect(TEST_DATABASE_URI, uri=True)
+
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        # Monkey-patch the seed function BEFORE importing create_app logic
+        # This prevents auto-seeding during create_app()
+        import app.models
+        monkeypatch.setattr(app.models, 'seed_comparison_stocks', lambda: None)
+
+        # Now create the app - manually without calling create_app() to avoid seeding
+        test_app = Flask(__name__, static_folder='../app/static')
+        test_app.config.update({
+            'TESTING': True,
+            'SECRET_KEY': 'test-secret-key',
+            'SQLALCHEMY_DATABASE_URI': f'sqlite:///{TEST_DATABASE_URI}&uri=true',
+            # Connections are handed between threads, but never used by two at once
+            'SQLALCHEMY_ENGINE_OPTIONS': {
+                'poolclass': QueuePool,
+                'connect_args': {'check_same_thread': False},
+            },
+            'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+        })
+
+        # Initialize extensions
+        db.init_app(test_app)
+        CORS(test_app)
+        login_manager.init_app(test_app)
+
+        @login_manager.user_loader
+        def load_user(user_id):
+            from app.models import User
+            return db.session.get(User, int(user_id))
+
+        # Register blueprints
+        from app.routes.purchases import purchases_bp
+        from app.routes.portfolio import portfolio_bp
+        from app.routes.stocks import stocks_bp
+
+        test_app.register_blueprint(purchases_bp, url_prefix='/api')
+        test_app.register_blueprint(portfolio_bp, url_prefix='/api')
+        test_app.register_blueprint(stocks_bp, url_prefix='/api')
+
+        with test_app.app_context():
+            # Create the database and tables, and seed the comparison stocks once
+            db.create_all()
+            db.session.add_all([
+                ComparisonStock(ticker=ticker, name=name, is_default=True)
+                for ticker, name in COMPARISON_STOCKS
+            ])
+            db.session.commit()
+            db.session.remove()
+
+        yield test_app
 
     # Cleanup
     with test_app.app_context():
         db.session.remove()
         db.drop_all()
+        db.engine.dispose()
+
+    keep_alive.close()
+
+
+def _empty_test_tables():
+    """
+    Delete every row written by a test, keeping the seeded comparison stocks.
+
+    Tests can't be isolated by rolling back a SAVEPOINT: the routes commit
+    through db.session, and Flask-SQLAlchemy always binds that session to the
+    engine rather than to a test-owned connection. Tables are emptied children
+    first so foreign keys stay satisfied.
+    """
+    from app.models import ComparisonStock
+
+    db.session.rollback()
+    for table in reversed(db.metadata.sorted_tables):
+        if table.name != ComparisonStock.__tablename__:
+            db.session.execute(table.delete())
+    db.session.commit()
+    db.session.remove()
+
+
+@pytest.fixture(scope='function')
+def app(_session_app):
+    """Provide the shared test application, emptying its tables after the test."""
+    yield _session_app
 
-    os.close(db_fd)
-    os.unlink(db_path)
+    with _session_app.app_context():
+        _empty_test_tables()
 
 
 @pytest.fixture(scope='function')
@@ -71,6 +160,14 @@ def client(app):
     return app.test_client()
 
 
+@pytest.fixture(scope='function')
+def auth_client(client, user):
+    """Create a test client logged in as the `user` fixture."""
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(user.id)
+    return client
+
+
 @pytest.fixture(scope='function')
 def db_session(app):
     """Provide a database session for direct database manipulation in tests."""
@@ -80,30 +177,26 @@ def db_session(app):
 
 @pytest.fixture(scope='function')
 def seed_comparison_stocks(app, db_session):
-    """Seed the database with default comparison stocks including META."""
+    """Return the default comparison stocks (including META), seeded once per run."""
     from app.models import ComparisonStock
 
-    comparison_stocks_data = [
-        ('SPY', 'S&P 500 ETF'),
-        ('AAPL', 'Apple'),
-        ('META', 'Meta'),
-        ('GOOGL', 'Alphabet/Google'),
-        ('NVDA', 'Nvidia'),
-        ('AMZN', 'Amazon'),
-    ]
-
-    stocks = []
-    for ticker, name in comparison_stocks_data:
-        stock = ComparisonStock(ticker=ticker, name=name, is_default=True)
-        db_session.add(stock)
-        stocks.append(stock)
+    return ComparisonStock.query.order_by(ComparisonStock.id).all()
+
 
+@pytest.fixture(scope='function')
+def user(app, db_session):
+    """Create the user that test purchases belong to."""
+    from app.models import User
+
+    user = User(email='test@example.com', name='Test User')
+    db_session.add(user)
     db_session.commit()
-    return stocks
+
+    return user
 
 
 @pytest.fixture(scope='function')
-def meta_purchase(app, db_session, seed_comparison_stocks):
+def meta_purchase(app, db_session, user, seed_comparison_stocks):
     """Create a META purchase with a known price for testing."""
     from app.models import Purchase
 
@@ -113,6 +206,7 @@ def meta_purchase(app, db_session, seed_comparison_stocks):
     shares_bought = purchase_amount / purchase_price  # 20.0 shares
 
     purchase = Purchase(
+        user_id=user.id,
         ticker='META',
         purchase_date=purchase_date,
         amount=purchase_amount,
@@ -126,49 +220,50 @@ def meta_purchase(app, db_session, seed_comparison_stocks):
     return purchase
 
 
-@pytest.fixture(scope='function', autouse=False)
-def mock_stock_prices(mocker):
+def _mock_purchase_price(ticker, date_obj):
+    return MOCK_PURCHASE_PRICES.get(ticker, 100.00)
+
+
+def _mock_current_price(ticker):
+    return MOCK_CURRENT_PRICES.get(ticker, 110.00)
+
+
+@pytest.fixture(scope='module', autouse=False)
+def mock_stock_prices(module_mocker):
     """
     Mock the stock_data service functions to avoid external yfinance calls.
     Returns the mocker instance for additional customization in tests.
 
     This fixture should be used by tests to avoid real yfinance API calls.
+    The patches are applied once per test module and stay active until the
+    module finishes. The routes import these functions by name, so they are
+    patched where the routes look them up; get_prices_on_date still runs for
+    real, reading PriceCache and falling back to the patched service
+    get_price_on_date. Per-test overrides belong on the function-scoped
+    `mocker`, so they don't leak into the rest of the module.
     """
     # Mock validate_ticker to always return True for test tickers
-    mocker.patch('app.services.stock_data.validate_ticker', return_value=True)
+    module_mocker.patch('app.routes.purchases.validate_ticker', return_value=True)
+    module_mocker.patch('app.routes.stocks.validate_ticker', return_value=True)
 
     # Mock is_trading_day to return True for test dates
-    mocker.patch('app.services.stock_data.is_trading_day', return_value=True)
+    module_mocker.patch('app.routes.purchases.is_trading_day', return_value=True)
 
     # Mock get_price_on_date with realistic prices
-    def mock_get_price_on_date(ticker, date_obj):
-        prices = {
-            'META': 500.00,   # Purchase date price
-            'SPY': 450.00,
-            'AAPL': 180.00,
-            'GOOGL': 140.00,
-            'NVDA': 500.00,
-            'AMZN': 150.00,
-        }
-        return prices.get(ticker, 100.00)
-
-    mocker.patch('app.services.stock_data.get_price_on_date', side_effect=mock_get_price_on_date)
+    module_mocker.patch('app.routes.purchases.get_price_on_date', side_effect=_mock_purchase_price)
+    module_mocker.patch('app.services.stock_data.get_price_on_date', side_effect=_mock_purchase_price)
 
     # Mock get_current_price with different prices (simulating price changes)
-    def mock_get_current_price(ticker):
-        current_prices = {
-            'META': 550.00,   # 10% gain
-            'SPY': 495.00,    # 10% gain
-            'AAPL': 198.00,   # 10% gain
-            'GOOGL': 154.00,  # 10% gain
-            'NVDA': 600.00,   # 20% gain
-            'AMZN': 165.00,   # 10% gain
-        }
-        return current_prices.get(ticker, 110.00)
-
-    mocker.patch('app.services.stock_data.get_current_price', side_effect=mock_get_current_price)
-
-    # Mock get_price_history to return empty dict (not needed for basic comparison test)
-    mocker.patch('app.services.stock_data.get_price_history', return_value={})
-
-    return mocker
+    module_mocker.patch('app.routes.purchases.get_current_price', side_effect=_mock_current_price)
+
+    # Mock get_price_histories to return empty dict (not needed for basic comparison test)
+    module_mocker.patch('app.routes.purchases.get_price_histories', return_value={})
+
+    return module_mocker
+
+
+@pytest.fixture(scope='function')
+def mock_yf_download():
+    """Patch yf.download in the stock_data service and return the mock."""
+    with patch('app.services.stock_data.yf.download') as mock_download:
+        yield mock_download
@@ -0,0 +1,231 @@
+"""
+Tests for FIFO sale assignment in app.services.sale_service.
+
+Shares remaining are computed in SQL (bought minus the sum of the sale
+assignments), both per lot and in total, so these tests check the FIFO
+order and amounts across several sales, including lots that earlier sales
+fully consumed, and the availability check that runs before each sale.
+"""
+import pytest
+from datetime import date
+
+from app.models import Purchase, Sale, PurchaseSaleAssignment, User
+from app.services.sale_service import (
+    TOLERANCE,
+    InsufficientSharesError,
+    _open_lots,
+    _shares_available,
+    create_sale_with_fifo,
+    preview_fifo_assignment,
+)
+
+
+SALE_DATE = date(2024, 6, 3)
+
+# Three lots of 10 shares, oldest first: (purchase_date, price_at_purchase)
+LOTS = [
+    (date(2024, 1, 15), 100.0),
+    (date(2024, 2, 15), 120.0),
+    (date(2024, 3, 15), 150.0),
+]
+
+
+def _make_lots(db_session, user, lots=LOTS, shares=10.0, ticker='AAPL'):
+    """Create and commit one purchase per (date, price) lot, returned in FIFO order."""
+    purchases = [
+        Purchase(
+            user_id=user.id,
+            ticker=ticker,
+            purchase_date=purchase_date,
+            amount=shares * price,
+            shares_bought=shares,
+            price_at_purchase=price
+        )
+        for purchase_date, price in lots
+    ]
+    db_session.add_all(purchases)
+    db_session.commit()
+    return purchases
+
+
+def _assigned(sale):
+    """Map purchase_id -> shares assigned for a sale."""
+    assignments = PurchaseSaleAssignment.query.filter_by(sale_id=sale.id).all()
+    return {a.purchase_id: a.shares_assigned for a in assignments}
+
+
+class TestFifoAssignment:
+    """FIFO assignment over lots whose remaining shares come from SQL."""
+
+    def test_partial_fifo_across_several_lots(self, app, db_session, user):
+        """Each sale continues from where the previous one stopped."""
+        first, second, third = _make_lots(db_session, user)
+
+        sale = create_sale_with_fifo(user.id, 'AAPL', SALE_DATE, 15.0, 200.0)
+        assert _assigned(sale) == {first.id: 10.0, second.id: 5.0}
+
+        sale = create_sale_with_fifo(user.id, 'AAPL', SALE_DATE, 8.0, 200.0)
+        assert _assigned(sale) == {second.id: 5.0, third.id: 3.0}
+
+        lots = _open_lots(user.id, 'AAPL')
+        assert [(lot.id, lot.shares_remaining) for lot in lots] == [(third.id, 7.0)]
+
+    def test_lot_consumed_by_earlier_sale_is_skipped(self, app, db_session, user):
+        """A lot sold in full no longer appears, and the next sale starts at the next lot."""
+        first, second, third = _make_lots(db_session, user)
+
+        create_sale_with_fifo(user.id, 'AAPL', SALE_DATE, 10.0, 200.0)
+
+        lots = _open_lots(user.id, 'AAPL')
+        assert [(lot.id, lot.shares_remaining) for lot in lots] == [
+            (second.id, 10.0),
+            (third.id, 10.0),
+        ]
+
+        sale = create_sale_with_fifo(user.id, 'AAPL', SALE_DATE, 4.0, 200.0)
+        assert _assigned(sale) == {second.id: 4.0}
+        assert sale.purchase_assignments[0].cost_basis == pytest.approx(4.0 * 120.0)
+
+    def test_assignments_on_other_lots_do_not_reduce_a_lot(self, app, db_session, user):
+        """Only a lot's own assignments count against it, not other tickers' sales."""
+        (msft,) = _make_lots(db_session, user, lots=LOTS[:1], ticker='MSFT')
+        first, second, third = _make_lots(db_session, user)
+
+        create_sale_with_fifo(user.id, 'MSFT', SALE_DATE, 10.0, 300.0)
+        create_sale_with_fifo(user.id, 'AAPL', SALE_DATE, 5.0, 200.0)
+
+        lots = _open_lots(user.id, 'AAPL')
+        assert [(lot.id, lot.shares_remaining) for lot in lots] == [
+            (first.id, 5.0),
+            (second.id, 10.0),
+            (third.id, 10.0),
+        ]
+        assert _open_lots(user.id, 'MSFT') == []
+
+    def test_remainder_within_tolerance_counts_as_sold(self, app, db_session, user):
+        """A lot left with TOLERANCE or fewer shares is treated as fully sold."""
+        first, second, third = _make_lots(db_session, user)
+
+        create_sale_with_fifo(user.id, 'AAPL', SALE_DATE, 10.0 - TOLERANCE / 2, 200.0)
+
+        lots = _open_lots(user.id, 'AAPL')
+        assert [lot.id for lot in lots] == [second.id, third.id]
+
+        sale = create_sale_with_fifo(user.id, 'AAPL', SALE_DATE, 1.0, 200.0)
+        assert _assigned(sale) == {second.id: 1.0}
+
+    def test_remainder_above_tolerance_stays_open(self, app, db_session, user):
+        """A lot left with just over TOLERANCE shares is still sold first."""
+        first, second, third = _make_lots(db_session, user)
+
+        create_sale_with_fifo(user.id, 'AAPL', SALE_DATE, 10.0 - 2 * TOLERANCE, 200.0)
+
+        lots = _open_lots(user.id, 'AAPL')
+        assert lots[0].id == first.id
+        assert lots[0].shares_remaining == pytest.approx(2 * TOLERANCE)
+
+    def test_overselling_within_tolerance_is_allowed(self, app, db_session, user):
+        """Requests up to TOLERANCE over the shares held succeed; more is rejected."""
+        _make_lots(db_session, user)
+
+        with pytest.raises(InsufficientSharesError):
+            create_sale_with_fifo(user.id, 'AAPL', SALE_DATE, 30.0 + 2 * TOLERANCE, 200.0)
+
+        sale = create_sale_with_fifo(user.id, 'AAPL', SALE_DATE, 30.0 + TOLERANCE / 2, 200.0)
+        assert sum(_assigned(sale).values()) == pytest.approx(30.0)
+        assert _open_lots(user.id, 'AAPL') == []
+
+    def test_preview_matches_create_without_writing(self, app, db_session, user):
+        """preview_fifo_assignment reports the assignments create_sale_with_fifo makes."""
+        first, second, third = _make_lots(db_session, user)
+        create_sale_with_fifo(user.id, 'AAPL', SALE_DATE, 6.0, 200.0)
+        sales_before = Sale.query.count()
+
+        preview = preview_fifo_assignment(user.id, 'AAPL', 12.0)
+
+        assert Sale.query.count() == sales_before
+        assert [(a['purchase_id'], a['shares_available'], a['shares_to_assign'])
+                for a in preview['assignments']] == [
+            (first.id, 4.0, 4.0),
+            (second.id, 10.0, 8.0),
+        ]
+        assert preview['total_cost_basis'] == pytest.approx(4.0 * 100.0 + 8.0 * 120.0)
+        assert preview['total_available'] == pytest.approx(24.0)
+        assert preview['is_sufficient'] is True
+        assert preview['shares_remaining_after'] == pytest.approx(12.0)
+
+        sale = create_sale_with_fifo(user.id, 'AAPL', SALE_DATE, 12.0, 200.0)
+        assert _assigned(sale) == {
+            a['purchase_id']: a['shares_to_assign'] for a in preview['assignments']
+        }
+        assert sum(a.cost_basis for a in sale.purchase_assignments) == pytest.approx(
+            preview['total_cost_basis']
+        )
+
+
+class TestSharesAvailable:
+    """The SQL aggregate that decides whether a sale can go ahead."""
+
+    def test_no_purchases(self, app, db_session, user):
+        """With no lots for the ticker, create raises and preview reports the error."""
+        _make_lots(db_session, user, ticker='MSFT')
+
+        assert _shares_available(user.id, 'AAPL') == (0, 0.0)
+
+        with pytest.raises(InsufficientSharesError, match='No purchases found'):
+            create_sale_with_fifo(user.id, 'AAPL', SALE_DATE, 1.0, 200.0)
+
+        preview = preview_fifo_assignment(user.id, 'AAPL', 1.0)
+        assert preview['is_sufficient'] is False
+        assert preview['total_available'] == 0.0
+        assert preview['assignments'] == []
+        assert 'error' in preview
+
+    def test_counts_only_the_users_lots_for_the_ticker(self, app, db_session, user):
+        """Shares bought minus shares assigned, scoped to one user and ticker."""
+        other_user = User(email='other@example.com', name='Other User')
+        db_session.add(other_user)
+        db_session.commit()
+        _make_lots(db_session, other_user)
+        _make_lots(db_session, user, ticker='MSFT')
+        _make_lots(db_session, user)
+
+        create_sale_with_fifo(user.id, 'AAPL', SALE_DATE, 12.5, 200.0)
+        create_sale_with_fifo(other_user.id, 'AAPL', SALE_DATE, 20.0, 200.0)
+
+        lot_count, total_available = _shares_available(user.id, 'AAPL')
+        assert lot_count == 3
+        assert total_available == pytest.approx(17.5)
+
+    def test_insufficient_shares(self, app, db_session, user):
+        """Selling more than is held is rejected before any sale is written."""
+        _make_lots(db_session, user)
+        create_sale_with_fifo(user.id, 'AAPL', SALE_DATE, 25.0, 200.0)
+        sales_before = Sale.query.count()
+
+        with pytest.raises(InsufficientSharesError, match='Insufficient shares available'):
+            create_sale_with_fifo(user.id, 'AAPL', SALE_DATE, 6.0, 200.0)
+        assert Sale.query.count() == sales_before
+
+        preview = preview_fifo_assignment(user.id, 'AAPL', 6.0)
+        assert preview['is_sufficient'] is False
+        assert preview['total_available'] == pytest.approx(5.0)
+        assert preview['shares_remaining_after'] is None
+
+    def test_selling_exactly_all_shares(self, app, db_session, user):
+        """All shares can be sold at once, after which nothing is available."""
+        _make_lots(db_session, user)
+
+        preview = preview_fifo_assignment(user.id, 'AAPL', 30.0)
+        assert preview['is_sufficient'] is True
+        assert preview['shares_remaining_after'] == pytest.approx(0.0)
+
+        sale = create_sale_with_fifo(user.id, 'AAPL', SALE_DATE, 30.0, 200.0)
+        assert sum(_assigned(sale).values()) == pytest.approx(30.0)
+
+        lot_count, total_available = _shares_available(user.id, 'AAPL')
+        assert lot_count == 3
+        assert total_available == pytest.approx(0.0)
+
+        with pytest.raises(InsufficientSharesError, match='Insufficient shares available'):
+            create_sale_with_fifo(user.id, 'AAPL', SALE_DATE, 1.0, 200.0)
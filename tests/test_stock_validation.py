@@ -11,17 +11,25 @@ The validation function has two code paths:
 - yfinance path: Other tickers are validated via yf.download()
 """
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock
 import pandas as pd
 
 from app.services.stock_data import validate_ticker
 
 
+# Canned yf.download results; validate_ticker only reads them, so they are shared
+EMPTY_DF = pd.DataFrame()
+NO_CLOSE_DF = pd.DataFrame({'Open': [100.0]})
+VALID_CLOSE_DF = pd.DataFrame({'Close': [150.0, 151.0, 152.0, 153.0, 154.0]})
+ETF_CLOSE_DF = pd.DataFrame({'Close': [400.0, 401.0, 402.0, 403.0, 404.0]})
+
+
+@pytest.mark.usefixtures('seed_comparison_stocks')
 class TestTickerValidation:
     """Test suite for the validate_ticker() function."""
 
     def test_spy_etf_passes_validation_via_fast_path(
-        self, app, db_session, seed_comparison_stocks
+        self, app, db_session
     ):
         """
         Test that SPY (an ETF) passes validation via the fast path.
@@ -40,7 +48,7 @@ class TestTickerValidation:
         )
 
     def test_spy_etf_case_insensitive(
-        self, app, db_session, seed_comparison_stocks
+        self, app, db_session
     ):
         """
         Test that ticker validation is case-insensitive.
@@ -54,8 +62,9 @@ class TestTickerValidation:
         assert result_lower is True, "Lowercase 'spy' should pass validation"
         assert result_mixed is True, "Mixed case 'Spy' should pass validation"
 
+    @pytest.mark.parametrize('ticker', ['SPY', 'AAPL', 'META', 'GOOGL', 'NVDA', 'AMZN'])
     def test_all_comparison_stocks_pass_validation(
-        self, app, db_session, seed_comparison_stocks
+        self, app, db_session, ticker
     ):
         """
         Test that all default comparison stocks pass validation via fast path.
@@ -63,72 +72,69 @@ class TestTickerValidation:
         These tickers should all be validated immediately without yfinance calls
         since they exist in the ComparisonStock table.
         """
-        comparison_tickers = ['SPY', 'AAPL', 'META', 'GOOGL', 'NVDA', 'AMZN']
-
         with app.app_context():
-            for ticker in comparison_tickers:
-                result = validate_ticker(ticker)
-                assert result is True, (
-                    f"Comparison stock {ticker} should pass validation via fast path"
-                )
+            assert validate_ticker(ticker) is True
 
-    def test_invalid_ticker_fails_validation(self, app, db_session):
+    def test_invalid_ticker_fails_validation(
+        self, app, db_session, mock_yf_download
+    ):
         """
         Test that invalid/fake tickers fail validation.
 
         When a ticker is not in the ComparisonStock table and yfinance
         returns no data, validation should return False.
         """
-        with patch('app.services.stock_data.yf.download') as mock_download:
-            # Simulate yfinance returning empty DataFrame for invalid ticker
-            mock_download.return_value = pd.DataFrame()
+        # Simulate yfinance returning empty DataFrame for invalid ticker
+        mock_yf_download.return_value = EMPTY_DF
 
-            with app.app_context():
-                result = validate_ticker('XYZNOTREAL123')
+        with app.app_context():
+            result = validate_ticker('XYZNOTREAL123')
 
-            assert result is False, (
-                "Invalid ticker 'XYZNOTREAL123' should fail validation"
-            )
-            # Verify yfinance was called since ticker is not a comparison stock
-            mock_download.assert_called_once()
+        assert result is False, (
+            "Invalid ticker 'XYZNOTREAL123' should fail validation"
+        )
+        # Verify yfinance was called since ticker is not a comparison stock
+        mock_yf_download.assert_called_once()
 
-    def test_ticker_with_no_close_column_fails_validation(self, app, db_session):
+    def test_ticker_with_no_close_column_fails_validation(
+        self, app, db_session, mock_yf_download
+    ):
         """
         Test that a ticker returning data without 'Close' column fails validation.
 
         This covers edge cases where yfinance returns malformed data.
         """
-        with patch('app.services.stock_data.yf.download') as mock_download:
-            # Simulate yfinance returning DataFrame without 'Close' column
-            mock_download.return_value = pd.DataFrame({'Open': [100.0]})
+        # Simulate yfinance returning DataFrame without 'Close' column
+        mock_yf_download.return_value = NO_CLOSE_DF
 
-            with app.app_context():
-                result = validate_ticker('BADDATA')
+        with app.app_context():
+            result = validate_ticker('BADDATA')
 
-            assert result is False, (
-                "Ticker with missing 'Close' column should fail validation"
-            )
+        assert result is False, (
+            "Ticker with missing 'Close' column should fail validation"
+        )
 
-    def test_yfinance_exception_returns_false(self, app, db_session):
+    def test_yfinance_exception_returns_false(
+        self, app, db_session, mock_yf_download
+    ):
         """
         Test that yfinance exceptions are handled gracefully.
 
         If yfinance raises an exception during validation, the function
         should return False rather than propagating the exception.
         """
-        with patch('app.services.stock_data.yf.download') as mock_download:
-            # Simulate yfinance raising an exception
-            mock_download.side_effect = Exception("Network error")
+        # Simulate yfinance raising an exception
+        mock_yf_download.side_effect = Exception("Network error")
 
-            with app.app_context():
-                result = validate_ticker('ERRORSTOCK')
+        with app.app_context():
+            result = validate_ticker('ERRORSTOCK')
 
-            assert result is False, (
-                "Ticker validation should return False on yfinance exception"
-            )
+        assert result is False, (
+            "Ticker validation should return False on yfinance exception"
+        )
 
     def test_valid_non_comparison_stock_passes_via_yfinance(
-        self, app, db_session
+        self, app, db_session, mock_yf_download
     ):
         """
         Test that valid stocks not in comparison list pass via yfinance path.
@@ -136,25 +142,22 @@ class TestTickerValidation:
         Stocks that are not comparison stocks should be validated through
         yfinance. This tests the fallback path when fast path doesn't match.
         """
-        with patch('app.services.stock_data.yf.download') as mock_download:
-            # Simulate yfinance returning valid data
-            mock_download.return_value = pd.DataFrame({
-                'Close': [150.0, 151.0, 152.0, 153.0, 154.0]
-            })
+        # Simulate yfinance returning valid data
+        mock_yf_download.return_value = VALID_CLOSE_DF
 
-            with app.app_context():
-                result = validate_ticker('MSFT')
+        with app.app_context():
+            result = validate_ticker('MSFT')
 
-            assert result is True, (
-                "Valid non-comparison stock should pass validation via yfinance"
-            )
-            # Verify yfinance was called with correct parameters
-            mock_download.assert_called_once_with(
-                'MSFT', period='5d', progress=False
-            )
+        assert result is True, (
+            "Valid non-comparison stock should pass validation via yfinance"
+        )
+        # Verify yfinance was called with correct parameters
+        mock_yf_download.assert_called_once_with(
+            'MSFT', period='5d', progress=False
+        )
 
     def test_fast_path_does_not_call_yfinance(
-        self, app, db_session, seed_comparison_stocks
+        self, app, db_session, mock_yf_download
     ):
         """
         Test that the fast path for comparison stocks does not call yfinance.
@@ -162,47 +165,65 @@ class TestTickerValidation:
         When a ticker is found in the ComparisonStock table, yfinance
         should not be called at all (optimization).
         """
-        with patch('app.services.stock_data.yf.download') as mock_download:
-            with app.app_context():
-                result = validate_ticker('AAPL')
+        with app.app_context():
+            result = validate_ticker('AAPL')
 
-            assert result is True
-            mock_download.assert_not_called(), (
-                "yfinance should not be called for comparison stocks"
-            )
+        assert result is True
+        mock_yf_download.assert_not_called(), (
+            "yfinance should not be called for comparison stocks"
+        )
 
-    def test_empty_ticker_fails_validation(self, app, db_session):
+    def test_fast_path_remembers_only_comparison_stocks(
+        self, app, db_session, mock_yf_download
+    ):
+        """
+        Test that the fast path remembers comparison stocks but not misses.
+
+        A miss must not be cached, or a comparison stock added later would
+        never take the fast path.
+        """
+        mock_yf_download.return_value = EMPTY_DF
+
+        with app.app_context():
+            validate_ticker('AAPL')
+            validate_ticker('XYZNOTREAL123')
+
+        known = app.extensions['comparison_tickers']
+        assert 'AAPL' in known
+        assert 'XYZNOTREAL123' not in known
+
+    def test_empty_ticker_fails_validation(
+        self, app, db_session, mock_yf_download
+    ):
         """
         Test that empty ticker string fails validation.
 
         Edge case to ensure empty strings don't cause unexpected behavior.
         """
-        with patch('app.services.stock_data.yf.download') as mock_download:
-            # Empty ticker should result in empty data
-            mock_download.return_value = pd.DataFrame()
+        # Empty ticker should result in empty data
+        mock_yf_download.return_value = EMPTY_DF
 
-            with app.app_context():
-                result = validate_ticker('')
+        with app.app_context():
+            result = validate_ticker('')
 
-            assert result is False, "Empty ticker string should fail validation"
+        assert result is False, "Empty ticker string should fail validation"
 
-    def test_etf_passes_via_yfinance_path(self, app, db_session):
+    def test_etf_passes_via_yfinance_path(
+        self, app, db_session, mock_yf_download
+    ):
         """
         Test that ETFs not in comparison list pass validation via yfinance.
 
         This tests that the yf.download() approach works for ETFs (unlike
         the old yf.Ticker().info approach that failed for ETFs).
         """
-        with patch('app.services.stock_data.yf.download') as mock_download:
-            # Simulate yfinance returning valid ETF data
-            mock_download.return_value = pd.DataFrame({
-                'Close': [400.0, 401.0, 402.0, 403.0, 404.0]
-            })
+        # Simulate yfinance returning valid ETF data
+        mock_yf_download.return_value = ETF_CLOSE_DF
 
-            with app.app_context():
-                # QQQ is an ETF not in the default comparison stocks
-                result = validate_ticker('QQQ')
+        with app.app_context():
+            # QQQ is an ETF not in the default comparison stocks
+            result = validate_ticker('QQQ')
 
-            assert result is True, (
-                "ETFs should pass validation via yfinance download path"
-            )
+        assert result is True, (
+            "ETFs should pass validation via yfinance download path"
+        )